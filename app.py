@@ -1,22 +1,13 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import pickle
 import numpy as np
 import pandas as pd
-import os
+from backend.services.model_registry import model_registry
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend communication
 
-# Load the trained XGBoost model
-model_path = os.path.join('models', 'xgboost_risk_model.pkl')
-try:
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    print("✅ XGBoost model loaded successfully")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    model = None
+# The trained XGBoost model is resolved lazily through the shared registry
 
 def generate_quote(risk_score, user_data):
     """
@@ -61,6 +52,7 @@ def generate_quote(risk_score, user_data):
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
+        model = model_registry.get_risk_model()
         if model is None:
             return jsonify({
                 'error': 'Model not loaded',
@@ -119,7 +111,8 @@ def predict():
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None
+        'model_loaded': model_registry.get_risk_model() is not None,
+        'models': model_registry.stats()
     })
 
 if __name__ == '__main__':
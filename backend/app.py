@@ -1,3 +1,5 @@
+import multiprocessing
+import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
@@ -23,8 +25,19 @@ def create_app(config_name='default'):
     app.config.from_object(config[config_name])
     print("Configuration loaded")
     
+    # Engine options (pool sizing / SQLite busy timeout) from config; explicit
+    # SQLALCHEMY_ENGINE_OPTIONS entries take precedence
+    from .services.db_engine import engine_options, is_sqlite, sqlite_pragmas, install_sqlite_pragmas
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    
     # Initialize extensions
     db.init_app(app)
+    if is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        with app.app_context():
+            install_sqlite_pragmas(db.engine, sqlite_pragmas(app.config))
     migrate.init_app(app, db)
     jwt.init_app(app)
     mail.init_app(app)
@@ -32,6 +45,57 @@ def create_app(config_name='default'):
     CORS(app)
     print("Extensions initialized")
     
+    # Size the in-process quote cache from config
+    from .services.quote_cache import quote_cache
+    quote_cache.configure(
+        max_size=app.config.get('QUOTE_CACHE_SIZE'),
+        ttl=app.config.get('QUOTE_CACHE_TTL'),
+        shared_path=app.config.get('QUOTE_CACHE_SHARED_PATH'),
+    )
+    
+    # Short-TTL cache of authenticated user snapshots
+    from .services.user_context import user_context_cache
+    user_context_cache.configure(ttl=app.config.get('USER_CONTEXT_TTL'))
+    
+    # Rendered PDF cache location and size bound
+    from .services.pdf_renderer import pdf_cache
+    pdf_cache.configure(
+        directory=app.config.get('PDF_CACHE_DIR') or os.path.join(app.instance_path, 'pdf_cache'),
+        max_bytes=app.config.get('PDF_CACHE_MAX_BYTES'),
+        memory_max_bytes=app.config.get('PDF_MEMORY_CACHE_BYTES'),
+        persist=app.config.get('PDF_CACHE_PERSIST'),
+    )
+    from .services.pdf_export import pdf_exporter
+    pdf_exporter.configure(
+        workers=app.config.get('PDF_EXPORT_WORKERS'),
+        max_quotes=app.config.get('PDF_EXPORT_MAX_QUOTES'),
+    )
+    
+    # In-process event bus behind the SSE streams
+    from .services.event_bus import event_bus
+    event_bus.configure(
+        history=app.config.get('EVENT_BUS_HISTORY'),
+        queue_size=app.config.get('EVENT_BUS_QUEUE_SIZE'),
+    )
+    
+    # Processes spawned by the PDF exporter re-import the main module, which may
+    # build the app again; they must not start their own background threads.
+    # (parent_process() is still None while that import runs, the name is not.)
+    start_background = multiprocessing.current_process().name == 'MainProcess'
+    
+    # Outbound mail sender pool
+    from .services.mail_dispatcher import mail_dispatcher
+    mail_dispatcher.init_app(app)
+    
+    # Persistent job queue for quote PDFs and emails
+    from .services.job_queue import job_queue
+    from .services import quote_jobs  # noqa: F401  (registers job handlers)
+    job_queue.init_app(app, start=start_background)
+    
+    # Conversation sessions: shared local store, written behind to the conversations table
+    from .services.session_store import session_store
+    session_store.init_app(app, start=start_background)
+    
     # Register blueprints
     from .routes.auth import auth_bp
     from .routes.prediction import prediction_bp
@@ -10,6 +10,20 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///underwriter.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite connection tuning (applied as PRAGMAs on every new connection)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'  # WAL lets readers run alongside the writer
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'  # safe with WAL, fewer fsyncs than FULL
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)  # wait for the write lock instead of failing
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)  # bytes
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', 'true').lower() == 'true'  # enforce FKs and ON DELETE CASCADE like PostgreSQL
+    
+    # Connection pool (Postgres and other server databases)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # seconds; below typical server idle timeouts
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
@@ -23,9 +37,53 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD') or 'your-app-password'
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER') or 'AutoUnderwriter <noreply@autounderwriter.com>'
     
+    # Mail dispatcher (sender pool with reused SMTP connections)
+    MAIL_WORKERS = int(os.environ.get('MAIL_WORKERS') or 2)  # sender threads = max open SMTP connections
+    MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE') or 500)  # submits beyond this are rejected
+    MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE') or 20)  # messages sent per connection wake-up
+    MAIL_RATE_LIMIT = float(os.environ.get('MAIL_RATE_LIMIT') or 10)  # messages/second per process (0 = unlimited)
+    MAIL_RATE_BURST = int(os.environ.get('MAIL_RATE_BURST') or 20)
+    MAIL_IDLE_TIMEOUT = float(os.environ.get('MAIL_IDLE_TIMEOUT') or 30)  # seconds before an idle connection closes
+    
     # ML Model
     MODEL_PATH = os.path.join('models', 'xgboost_risk_model.pkl')
     
+    # Quote cache (model outputs keyed by feature hash + model version)
+    QUOTE_CACHE_SIZE = int(os.environ.get('QUOTE_CACHE_SIZE') or 2048)
+    QUOTE_CACHE_TTL = int(os.environ.get('QUOTE_CACHE_TTL') or 600)  # seconds
+    QUOTE_CACHE_SHARED_PATH = os.environ.get('QUOTE_CACHE_SHARED_PATH')  # optional SQLite file shared by workers
+    
+    # Authenticated user snapshots cached per JWT subject (0 disables; per-request memo still applies)
+    USER_CONTEXT_TTL = int(os.environ.get('USER_CONTEXT_TTL') or 30)  # seconds
+    
+    # Background jobs (quote PDF rendering and email) - persistent SQLite queue
+    JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH')  # default: <instance>/jobs.db
+    JOB_QUEUE_WORKERS = int(os.environ.get('JOB_QUEUE_WORKERS') or 2)  # worker threads per process
+    JOB_QUEUE_MAX_PENDING = int(os.environ.get('JOB_QUEUE_MAX_PENDING') or 1000)
+    JOB_QUEUE_MAX_ATTEMPTS = int(os.environ.get('JOB_QUEUE_MAX_ATTEMPTS') or 5)
+    JOB_QUEUE_BACKOFF_BASE = float(os.environ.get('JOB_QUEUE_BACKOFF_BASE') or 2.0)  # seconds, doubled per retry
+    JOB_QUEUE_RETENTION_SECONDS = int(os.environ.get('JOB_QUEUE_RETENTION_SECONDS') or 7 * 24 * 3600)  # keep done/failed jobs this long
+    
+    # Rendered quote PDFs (content-addressed by quote id + version + language)
+    PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR')  # default: <instance>/pdf_cache
+    PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES') or 200 * 1024 * 1024)
+    PDF_CACHE_PERSIST = os.environ.get('PDF_CACHE_PERSIST', 'true').lower() == 'true'  # false = memory only
+    PDF_MEMORY_CACHE_BYTES = int(os.environ.get('PDF_MEMORY_CACHE_BYTES') or 32 * 1024 * 1024)
+    PDF_EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS') or 1)  # render processes for ZIP export (1 = in-process)
+    PDF_EXPORT_MAX_QUOTES = int(os.environ.get('PDF_EXPORT_MAX_QUOTES') or 500)
+    
+    # Server-Sent Events (in-process event bus)
+    EVENT_BUS_HISTORY = int(os.environ.get('EVENT_BUS_HISTORY') or 100)  # events kept per topic for Last-Event-ID replay
+    EVENT_BUS_QUEUE_SIZE = int(os.environ.get('EVENT_BUS_QUEUE_SIZE') or 100)  # per-stream backlog before events are dropped
+    SSE_KEEPALIVE_SECONDS = int(os.environ.get('SSE_KEEPALIVE_SECONDS') or 15)
+    SSE_MAX_SECONDS = int(os.environ.get('SSE_MAX_SECONDS') or 300)  # stream lifetime before the client reconnects
+    
+    # Conversation session store (local SQLite shared by workers, write-behind to the database)
+    SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH')  # default: <instance>/sessions.db
+    SESSION_FLUSH_INTERVAL = float(os.environ.get('SESSION_FLUSH_INTERVAL') or 2.0)  # seconds between batched flushes
+    SESSION_FLUSH_BATCH = int(os.environ.get('SESSION_FLUSH_BATCH') or 200)
+    SESSION_IDLE_TIMEOUT = int(os.environ.get('SESSION_IDLE_TIMEOUT') or 300)  # seconds before a flushed session is dropped
+    
     # i18n
     LANGUAGES = ['en', 'sw']  # English and Swahili
     BABEL_DEFAULT_LOCALE = 'en'
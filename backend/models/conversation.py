@@ -1,9 +1,44 @@
 from datetime import datetime
 from uuid import uuid4
+from sqlalchemy import func, insert
 from backend.app import db
 
 
-class Conversation(db.Model):
+class ConversationState:
+    """Serialisation shared by the Conversation row and the in-memory session (services.session_store)."""
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'data': self.data or {},
+            'questions': self.questions or [],
+            'index': self.index,
+            'status': self.status,
+            'version': self.version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def next_question(self) -> dict | None:
+        questions = self.questions or []
+        return questions[self.index] if (self.index or 0) < len(questions) else None
+
+    def to_delta(self, changed: dict | None = None) -> dict:
+        """Compact turn response: the next question, the fields this turn changed and the state version.
+        Size does not depend on how many questions or answers the session has accumulated.
+        """
+        return {
+            'conversation_id': self.id,
+            'version': self.version,
+            'status': self.status,
+            'index': self.index,
+            'next_question': self.next_question(),
+            'changed': changed or {},
+        }
+
+
+class Conversation(ConversationState, db.Model):
     __tablename__ = 'conversations'
 
     id = db.Column(db.String(36), primary_key=True)
@@ -12,6 +47,7 @@ class Conversation(db.Model):
     questions = db.Column(db.JSON, default=list)
     index = db.Column(db.Integer, default=0)
     status = db.Column(db.String(20), default='in_progress')
+    version = db.Column(db.Integer, nullable=False, default=1, server_default=db.text('1'))  # bumped on every state change
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -20,14 +56,61 @@ class Conversation(db.Model):
         if not getattr(self, 'id', None):
             self.id = str(uuid4())
 
+
+class ConversationMessage(db.Model):
+    """One chat message; append-only, ordered by a per-conversation sequence number."""
+    __tablename__ = 'conversation_messages'
+    __table_args__ = (
+        db.UniqueConstraint('conversation_id', 'seq', name='uq_conversation_messages_seq'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.String(36), db.ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)  # 1, 2, 3... within the conversation
+    sender = db.Column(db.String(10), nullable=False)  # user | bot
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def append(cls, conversation_id: str, sender: str, text: str) -> 'ConversationMessage':
+        """Add one message with the next seq; a single-row INSERT.
+        The unique (conversation_id, seq) constraint rejects a concurrent append
+        that picked the same seq; callers roll back and retry on IntegrityError.
+        """
+        return cls.append_many(conversation_id, [(sender, text)])[0]
+
+    @classmethod
+    def append_many(cls, conversation_id: str, entries: list) -> list:
+        """Insert (sender, text) entries in order with consecutive seqs as one executemany.
+        Returns transient (unattached) instances, so reading them after commit costs no queries.
+        """
+        start = cls.last_seq(conversation_id)
+        now = datetime.utcnow()
+        rows = [
+            {'conversation_id': conversation_id, 'seq': start + i, 'sender': sender, 'text': text, 'created_at': now}
+            for i, (sender, text) in enumerate(entries, start=1)
+        ]
+        db.session.execute(insert(cls), rows)
+        return [cls(**row) for row in rows]
+
+    @classmethod
+    def last_seq(cls, conversation_id: str) -> int:
+        return db.session.query(func.coalesce(func.max(cls.seq), 0)).filter(
+            cls.conversation_id == conversation_id
+        ).scalar()
+
+    @classmethod
+    def after(cls, conversation_id: str, after_seq: int = 0, limit: int | None = None):
+        """Messages with seq > after_seq, oldest first (index range scan)."""
+        query = cls.query.filter(cls.conversation_id == conversation_id, cls.seq > after_seq).order_by(cls.seq)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
     def to_dict(self) -> dict:
         return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'data': self.data or {},
-            'questions': self.questions or [],
-            'index': self.index,
-            'status': self.status,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'seq': self.seq,
+            'sender': self.sender,
+            'text': self.text,
+            'ts': self.created_at.isoformat() + 'Z' if self.created_at else None,
         }
@@ -3,6 +3,11 @@ from backend.app import db
 
 class Policy(db.Model):
     __tablename__ = 'policies'
+    __table_args__ = (
+        # Latest policy per user (KYC verify) and policy lookups by quote
+        db.Index('ix_policies_user_created', 'user_id', 'created_at'),
+        db.Index('ix_policies_quote_id', 'quote_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -3,6 +3,12 @@ from backend.app import db
 
 class Quote(db.Model):
     __tablename__ = 'quotes'
+    __table_args__ = (
+        # Covers /user/quotes/stats: filter by user, group by risk level, aggregate amounts
+        db.Index('ix_quotes_user_risk_amount', 'user_id', 'risk_level', 'quote_amount'),
+        # Per-user history and "latest quote" lookups (filter by user, newest first)
+        db.Index('ix_quotes_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -36,6 +42,26 @@ class Quote(db.Model):
     pdf_generated = db.Column(db.Boolean, default=False)
     pdf_path = db.Column(db.String(255), nullable=True)
     
+    # Columns loaded by list views; leaves out the large input_data/driving_patterns JSON
+    SUMMARY_COLUMNS = (
+        'id', 'user_id', 'risk_score', 'risk_level', 'quote_amount', 'credit_score',
+        'vehicle_category', 'cover_type', 'add_ons', 'term_months', 'kyc_status',
+        'valuation_required', 'mechanical_assessment_required', 'created_at',
+        'email_sent', 'pdf_generated'
+    )
+    
+    @classmethod
+    def summary_query(cls):
+        """Query selecting only SUMMARY_COLUMNS (returns rows, not Quote objects)"""
+        return db.session.query(*[getattr(cls, name) for name in cls.SUMMARY_COLUMNS])
+    
+    @classmethod
+    def summary_to_dict(cls, row):
+        """Convert a summary_query row to a dictionary for list responses"""
+        data = dict(zip(cls.SUMMARY_COLUMNS, row))
+        data['created_at'] = data['created_at'].isoformat() if data['created_at'] else None
+        return data
+    
     def to_dict(self):
         """Convert quote to dictionary for JSON responses"""
         return {
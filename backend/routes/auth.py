@@ -8,6 +8,7 @@ from flask_jwt_extended import (
 from email_validator import validate_email, EmailNotValidError
 from backend.app import db
 from backend.models.user import User
+from backend.services.user_context import current_user, invalidate_user
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -173,6 +174,7 @@ def ensure_user():
 def refresh():
     """Refresh access token"""
     try:
+        # Always read the row here so a deactivation takes effect immediately
         current_user_id = get_jwt_identity()
         user = User.query.get(int(current_user_id))
         if not user or (hasattr(user, "is_active") and not user.is_active):
@@ -189,8 +191,7 @@ def refresh():
 def get_profile():
     """Get current user profile"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
+        user = current_user()
         if not user:
             return jsonify({"error": "User not found"}), 404
         return jsonify({"user": user.to_dict()}), 200
@@ -218,6 +219,7 @@ def update_profile():
                 return jsonify({"error": "Invalid language preference"}), 400
 
         db.session.commit()
+        invalidate_user(user.id)
         return jsonify({"message": "Profile updated successfully", "user": user.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
@@ -1,11 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
 from datetime import datetime
+import json
+import time
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, exceptions as jwt_exceptions
 from backend.app import db
-from backend.models.conversation import Conversation
+from backend.models.conversation import Conversation, ConversationMessage, ConversationState
+from backend.services.session_store import session_store, ConversationSession, SessionConflict
+from backend.services.event_bus import event_bus, conversation_topic, user_topic
+from sqlalchemy.exc import IntegrityError
 
 conversation_bp = Blueprint('conversation', __name__)
 
+# Retries when a concurrent append took the same message seq
+APPEND_ATTEMPTS = 3
+# Upper bound on messages accepted by /conversation/messages in one request
+MAX_BATCH_MESSAGES = 200
+
 DEFAULT_QUESTIONS = [
     {'field': 'AGE', 'question': 'What is your age?', 'type': 'number'},
     {'field': 'CAR_USE', 'question': 'Is the car for commercial(1) or private(0) use?', 'type': 'select', 'options': [0, 1]},
@@ -25,6 +35,39 @@ def _try_get_user_id() -> int | None:
         return None
 
 
+def _wants_delta(payload: dict | None = None) -> bool:
+    """Compact responses: ?delta=true (or "delta": true in the JSON body)."""
+    if request.args.get('delta', '').lower() == 'true':
+        return True
+    return bool((payload or {}).get('delta'))
+
+
+def _precondition_failed(conv: ConversationState):
+    """412 if the client sent If-Match with a state version other than the current one."""
+    if request.if_match and not request.if_match.contains(str(conv.version)):
+        return jsonify({
+            'error': 'Conversation state has changed',
+            'version': conv.version,
+        }), 412
+    return None
+
+
+def _turn_response(conv: ConversationState, body: dict, delta: bool, changed: dict | None = None):
+    """Full state (default) or the compact delta, tagged with the state version as ETag."""
+    if delta:
+        body = {k: v for k, v in body.items() if k in ('message', 'messages', 'last_seq')}
+        body.update(conv.to_delta(changed))
+    else:
+        body = {**body, 'state': conv.to_dict()}
+    response = jsonify(body)
+    response.set_etag(str(conv.version))
+    return response, 200
+
+
+def _publish_turn(conv: ConversationState, changed: dict | None = None) -> None:
+    event_bus.publish(conversation_topic(conv.id), 'question', conv.to_delta(changed))
+
+
 @conversation_bp.route('/conversation/start', methods=['POST'])
 def start():
     payload = request.get_json(silent=True) or {}
@@ -37,97 +80,259 @@ def start():
         questions=DEFAULT_QUESTIONS,
         index=0,
         status='in_progress',
+        version=1,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     db.session.add(conv)
     db.session.commit()
+    session_store.put(ConversationSession.from_model(conv))
 
-    next_q = conv.questions[0] if conv.questions else None
-    return jsonify({'conversation_id': conv.id, 'next_question': next_q, 'state': conv.to_dict()}), 200
+    return _turn_response(
+        conv,
+        {'conversation_id': conv.id, 'next_question': conv.next_question()},
+        _wants_delta(payload),
+        changed=prefill,
+    )
 
 
 @conversation_bp.route('/conversation/respond', methods=['POST'])
 def respond():
+    """Record the answer to the current question.
+    Send If-Match: "<version>" to reject the answer (412) if the state moved on
+    since the client last saw it; add ?delta=true for the compact response.
+    """
     data = request.get_json() or {}
     conv_id = data.get('conversation_id')
     answer = data.get('answer')
+    delta = _wants_delta(data)
 
     if not conv_id:
         return jsonify({'error': 'conversation_id is required'}), 400
 
-    conv: Conversation | None = Conversation.query.get(conv_id)
+    # Turn state lives in the session store; the conversations row is updated write-behind
+    conv: ConversationSession | None = session_store.get(conv_id)
     if not conv:
         return jsonify({'error': 'Invalid conversation_id'}), 400
 
+    failed = _precondition_failed(conv)
+    if failed:
+        return failed
+
+    read_version = conv.version
     idx = conv.index
     if idx >= len(conv.questions or []):
+        if conv.status == 'completed':
+            return _turn_response(conv, {'message': 'Conversation already completed'}, delta)
         conv.status = 'completed'
-        db.session.commit()
-        return jsonify({'message': 'Conversation already completed', 'state': conv.to_dict()}), 200
-
-    # Save answer
-    field = (conv.questions or [])[idx]['field']
-    data_map = conv.data or {}
-    data_map[field] = answer
-    conv.data = data_map
-    conv.index = idx + 1
+        body, changed = {'message': 'Conversation already completed'}, None
+    else:
+        # Save answer
+        field = conv.questions[idx]['field']
+        conv.data = {**(conv.data or {}), field: answer}
+        conv.index = idx + 1
+        changed = {field: answer}
+        if conv.index < len(conv.questions):
+            body = {'next_question': conv.next_question()}
+        else:
+            conv.status = 'ready_for_risk'
+            body = {'message': 'Collected required info'}
+    conv.version += 1
     conv.updated_at = datetime.utcnow()
 
-    if conv.index < len(conv.questions or []):
-        next_q = conv.questions[conv.index]
-        db.session.commit()
-        return jsonify({'next_question': next_q, 'state': conv.to_dict()}), 200
+    try:
+        session_store.save(conv, read_version)
+    except SessionConflict:
+        current = session_store.get(conv_id)
+        return jsonify({
+            'error': 'Conversation state has changed',
+            'version': current.version if current else None,
+        }), 409
 
-    conv.status = 'ready_for_risk'
-    db.session.commit()
-    return jsonify({'message': 'Collected required info', 'state': conv.to_dict()}), 200
+    _publish_turn(conv, changed)
+    return _turn_response(conv, body, delta, changed)
 
 
 @conversation_bp.route('/conversation/status/<conv_id>', methods=['GET'])
 def status(conv_id: str):
-    conv: Conversation | None = Conversation.query.get(conv_id)
+    """Conversation state plus its messages.
+    Query params (optional):
+      - after_seq: only messages with a higher sequence number (default 0 = all)
+      - limit: max messages to return (default 200, max 500)
+    Poll with after_seq=<last_seq from the previous response> to fetch only new messages.
+    """
+    conv: ConversationSession | None = session_store.get(conv_id)
     if not conv:
         return jsonify({'error': 'Not found'}), 404
-    return jsonify({'state': conv.to_dict()}), 200
+
+    # ETag covers the state version and the newest message; If-None-Match -> 304
+    etag = f'{conv.version}.{ConversationMessage.last_seq(conv.id)}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    after_seq = max(0, request.args.get('after_seq', 0, type=int))
+    limit = max(1, min(request.args.get('limit', 200, type=int), 500))
+    messages = ConversationMessage.after(conv.id, after_seq, limit + 1)
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    response = jsonify({
+        'state': conv.to_dict(),
+        'messages': [m.to_dict() for m in messages],
+        'last_seq': messages[-1].seq if messages else after_seq,
+        'has_more': has_more,
+    })
+    response.set_etag(etag)
+    return response, 200
+
+
+def _parse_message(raw) -> tuple[tuple[str, str] | None, str | None]:
+    """((sender, text), None) for a valid message body, else (None, error)."""
+    if not isinstance(raw, dict):
+        return None, 'message must be an object'
+    sender = raw.get('sender')
+    text = raw.get('text')
+    if not isinstance(sender, str) or sender.strip() not in ('user', 'bot'):
+        return None, "sender must be 'user' or 'bot'"
+    if text is not None and not isinstance(text, str):
+        return None, 'text must be a string'
+    sender, text = sender.strip(), (text or '').strip()
+    if not text:
+        return None, 'text is required'
+    return (sender, text), None
+
+
+def _append_messages(conv: ConversationState, entries: list):
+    """Insert the entries with consecutive seqs and commit; None if concurrent appends kept colliding."""
+    for _ in range(APPEND_ATTEMPTS):
+        try:
+            messages = ConversationMessage.append_many(conv.id, entries)
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            continue
+        for message in messages:
+            event_bus.publish(conversation_topic(conv.id), 'message', message.to_dict())
+        return messages
+    return None
 
 
 @conversation_bp.route('/conversation/message', methods=['POST'])
 def append_message():
-    """Append a chat message into Conversation.data.messages.
+    """Append a chat message to the conversation's message log (one row insert).
     Body: { conversation_id: str, sender: 'user'|'bot', text: str }
-    Returns: { state }
+    Returns: { message: {seq, sender, text, ts}, state }, or with ?delta=true
+    { message, conversation_id, version, ... } without the state.
     """
     body = request.get_json() or {}
     conv_id = body.get('conversation_id')
-    sender = (body.get('sender') or '').strip()
-    text = (body.get('text') or '').strip()
 
     if not conv_id:
         return jsonify({'error': 'conversation_id is required'}), 400
-    if sender not in ('user', 'bot'):
-        return jsonify({'error': "sender must be 'user' or 'bot'"}), 400
-    if not text:
-        return jsonify({'error': 'text is required'}), 400
+    entry, error = _parse_message(body)
+    if error:
+        return jsonify({'error': error}), 400
 
-    conv: Conversation | None = Conversation.query.get(conv_id)
+    conv: ConversationSession | None = session_store.get(conv_id)
     if not conv:
         return jsonify({'error': 'Invalid conversation_id'}), 400
 
-    # Ensure messages array exists in data
-    data_map = conv.data or {}
-    msgs = data_map.get('messages') or []
-    if not isinstance(msgs, list):
-        msgs = []
+    messages = _append_messages(conv, [entry])
+    if messages is None:
+        return jsonify({'error': 'Concurrent message append; please retry'}), 409
 
-    msgs.append({
-        'sender': sender,
-        'text': text,
-        'ts': datetime.utcnow().isoformat() + 'Z',
-    })
-    data_map['messages'] = msgs
-    conv.data = data_map
-    conv.updated_at = datetime.utcnow()
-    db.session.commit()
+    return _turn_response(conv, {'message': messages[0].to_dict()}, _wants_delta(body))
+
+
+@conversation_bp.route('/conversation/messages', methods=['POST'])
+def append_messages():
+    """Append a batch of chat messages in order, in one transaction.
+    Body: { conversation_id: str, messages: [{ sender: 'user'|'bot', text: str }, ...] }
+    All messages are stored or none are (400 names the first invalid index).
+    Returns: { messages: [{seq, sender, text, ts}, ...], last_seq, state } (?delta=true drops state)
+    """
+    body = request.get_json() or {}
+    conv_id = body.get('conversation_id')
+    raw_messages = body.get('messages')
+
+    if not conv_id:
+        return jsonify({'error': 'conversation_id is required'}), 400
+    if not isinstance(raw_messages, list) or not raw_messages:
+        return jsonify({'error': 'messages must be a non-empty list'}), 400
+    if len(raw_messages) > MAX_BATCH_MESSAGES:
+        return jsonify({'error': f'Too many messages (max {MAX_BATCH_MESSAGES})'}), 400
+
+    entries = []
+    for i, raw in enumerate(raw_messages):
+        entry, error = _parse_message(raw)
+        if error:
+            return jsonify({'error': f'messages[{i}]: {error}', 'index': i}), 400
+        entries.append(entry)
+
+    conv: ConversationSession | None = session_store.get(conv_id)
+    if not conv:
+        return jsonify({'error': 'Invalid conversation_id'}), 400
 
-    return jsonify({'state': conv.to_dict()}), 200
+    messages = _append_messages(conv, entries)
+    if messages is None:
+        return jsonify({'error': 'Concurrent message append; please retry'}), 409
+
+    return _turn_response(conv, {
+        'messages': [m.to_dict() for m in messages],
+        'last_seq': messages[-1].seq,
+    }, _wants_delta(body))
+
+
+@conversation_bp.route('/conversation/stream/<conv_id>', methods=['GET'])
+def stream(conv_id: str):
+    """Server-Sent Events for one conversation.
+    Events: state (snapshot on connect), question (each answered turn), message,
+    and, when the request carries the owner's JWT, quote / job / policy events for
+    that user. Reconnects send Last-Event-ID (or ?last_event_id=) to replay missed
+    events; `resync` means events were dropped and the client should refetch status.
+    """
+    conv: ConversationSession | None = session_store.get(conv_id)
+    if not conv:
+        return jsonify({'error': 'Not found'}), 404
+
+    topics = [conversation_topic(conv.id)]
+    if conv.user_id is not None and _try_get_user_id() == conv.user_id:
+        topics.append(user_topic(conv.user_id))
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    keepalive = float(current_app.config.get('SSE_KEEPALIVE_SECONDS', 15))
+    max_seconds = float(current_app.config.get('SSE_MAX_SECONDS', 300))
+    subscription = event_bus.subscribe(topics, last_event_id)
+    # Snapshot after subscribing, so a turn saved in between is in the snapshot,
+    # the subscription, or both (a repeated delta is harmless), never neither
+    snapshot = (session_store.get(conv_id) or conv).to_delta()
+
+    def events():
+        try:
+            yield f'retry: {int(keepalive * 1000)}\n\n'
+            if last_event_id is None:
+                yield f'event: state\ndata: {json.dumps(snapshot)}\n\n'
+            # Bounded lifetime frees the worker thread; EventSource reconnects with Last-Event-ID
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=keepalive)
+                if event is not None:
+                    yield event.to_sse()
+                else:
+                    yield ': keepalive\n\n'
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield 'event: resync\ndata: {}\n\n'
+        finally:
+            subscription.close()
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
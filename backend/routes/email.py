@@ -1,45 +1,37 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from flask_mail import Message
-from backend.app import db, mail
-from backend.models.user import User
+from backend.app import db
 from backend.models.quote import Quote
-import threading
+from backend.services.user_context import current_user
+from backend.services.mail_dispatcher import mail_dispatcher, MailQueueFull
 import os
 
 email_bp = Blueprint('email', __name__)
 
-def send_async_email(app, msg):
-    """Send email asynchronously"""
-    with app.app_context():
-        try:
-            mail.send(msg)
-        except Exception as e:
-            print(f"Error sending email: {e}")
-
-def send_quote_email(user, quote, language='en', attachment_path: str | None = None):
-    """Send quote email to user"""
-    try:
-        # Email content based on language
-        if language == 'sw':
-            subject = f"Nukuu yako ya Bima kutoka AutoUnderwriter"
-            greeting = f"Hujambo {user.name},"
-            intro = "Hapa ni nukuu yako ya bima:"
-            risk_label = "Kiwango cha Hatari:"
-            amount_label = "Kiasi cha Nukuu:"
-            footer = "Asante kwa kutumia AutoUnderwriter!"
-            closing = "Heshima,"
-        else:
-            subject = f"Your Insurance Quote from AutoUnderwriter"
-            greeting = f"Hello {user.name},"
-            intro = "Here is your insurance quote:"
-            risk_label = "Risk Level:"
-            amount_label = "Quote Amount:"
-            footer = "Thank you for using AutoUnderwriter!"
-            closing = "Best regards,"
-        
-        # Create email content
-        email_body = f"""
+def build_quote_email(user, quote, language='en', attachment_path: str | None = None,
+                      attachment: bytes | None = None):
+    """Build the quote email Message, attaching the PDF from `attachment` bytes or `attachment_path`"""
+    # Email content based on language
+    if language == 'sw':
+        subject = f"Nukuu yako ya Bima kutoka AutoUnderwriter"
+        greeting = f"Hujambo {user.name},"
+        intro = "Hapa ni nukuu yako ya bima:"
+        risk_label = "Kiwango cha Hatari:"
+        amount_label = "Kiasi cha Nukuu:"
+        footer = "Asante kwa kutumia AutoUnderwriter!"
+        closing = "Heshima,"
+    else:
+        subject = f"Your Insurance Quote from AutoUnderwriter"
+        greeting = f"Hello {user.name},"
+        intro = "Here is your insurance quote:"
+        risk_label = "Risk Level:"
+        amount_label = "Quote Amount:"
+        footer = "Thank you for using AutoUnderwriter!"
+        closing = "Best regards,"
+    
+    # Create email content
+    email_body = f"""
 {greeting}
 
 {intro}
@@ -54,36 +46,50 @@ Date: {quote.created_at.strftime('%B %d, %Y at %I:%M %p')}
 
 {closing}
 AutoUnderwriter Team
-        """
+    """
+    
+    # Create message
+    msg = Message(
+        subject=subject,
+        recipients=[user.email],
+        body=email_body
+    )
+    # Attach PDF if provided and exists
+    try:
+        if attachment is not None:
+            msg.attach(
+                filename=f'insurance_quote_{quote.id}.pdf',
+                content_type='application/pdf',
+                data=attachment
+            )
+        elif attachment_path and os.path.exists(attachment_path):
+            with open(attachment_path, 'rb') as f:
+                data = f.read()
+            msg.attach(
+                filename=os.path.basename(attachment_path),
+                content_type='application/pdf',
+                data=data
+            )
+    except Exception as e:
+        print(f"Warning: could not attach PDF: {e}")
+    
+    return msg
+
+def send_quote_email(user, quote, language='en', attachment_path: str | None = None,
+                     attachment: bytes | None = None):
+    """Send quote email to user"""
+    try:
+        msg = build_quote_email(user, quote, language, attachment_path, attachment)
         
-        # Create message
-        msg = Message(
-            subject=subject,
-            recipients=[user.email],
-            body=email_body
-        )
-        # Attach PDF if provided and exists
-        try:
-            if attachment_path and os.path.exists(attachment_path):
-                with open(attachment_path, 'rb') as f:
-                    data = f.read()
-                msg.attach(
-                    filename=os.path.basename(attachment_path),
-                    content_type='application/pdf',
-                    data=data
-                )
-        except Exception as e:
-            print(f"Warning: could not attach PDF: {e}")
-        
-        # Send email in background thread
-        thread = threading.Thread(
-            target=send_async_email,
-            args=(current_app._get_current_object(), msg)
-        )
-        thread.start()
+        # Hand off to the mail dispatcher's sender pool
+        mail_dispatcher.submit(msg)
         
         return True
         
+    except MailQueueFull as e:
+        print(f"Email not queued: {e}")
+        return False
+        
     except Exception as e:
         print(f"Error preparing email: {e}")
         return False
@@ -93,8 +99,7 @@ AutoUnderwriter Team
 def send_quote_email_endpoint(quote_id):
     """Send quote email to authenticated user"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -130,8 +135,7 @@ def send_quote_email_endpoint(quote_id):
 def send_latest_quote_email():
     """Send the most recent quote email to authenticated user"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -183,11 +187,10 @@ def test_email():
         )
         
         # Send email in background
-        thread = threading.Thread(
-            target=send_async_email,
-            args=(current_app._get_current_object(), msg)
-        )
-        thread.start()
+        try:
+            mail_dispatcher.submit(msg)
+        except MailQueueFull as e:
+            return jsonify({'error': str(e)}), 503
         
         return jsonify({
             'message': 'Test email sent successfully',
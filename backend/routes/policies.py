@@ -5,9 +5,10 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.app import db
 from backend.services.validators import issuance_prechecks, compute_vehicle_age
 from backend.services.reference.loader import get_motor_reference
-from backend.models.user import User
 from backend.models.quote import Quote
 from backend.models.policy import Policy
+from backend.services.user_context import current_user
+from backend.services.event_bus import event_bus, user_topic
 
 policies_bp = Blueprint('policies', __name__)
 
@@ -17,6 +18,16 @@ def _gen_policy_number(user_id: int, quote_id: int) -> str:
     return f"POL-{user_id}-{quote_id}-{ts}"
 
 
+def publish_policy_status(policy: Policy) -> None:
+    """Push the policy's status/KYC state to the owner's event stream."""
+    event_bus.publish(user_topic(policy.user_id), 'policy', {
+        'policy_id': policy.id,
+        'quote_id': policy.quote_id,
+        'status': policy.status,
+        'kyc_status': policy.kyc_status,
+    })
+
+
 @policies_bp.route('/policies/bind', methods=['POST'])
 @jwt_required()
 def bind_policy():
@@ -30,8 +41,7 @@ def bind_policy():
     if not quote_id:
         return jsonify({'error': "'quote_id' is required"}), 400
 
-    current_user_id = int(get_jwt_identity())
-    user = User.query.get(current_user_id)
+    user = current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
@@ -91,6 +101,7 @@ def bind_policy():
     )
     db.session.add(policy)
     db.session.commit()
+    publish_policy_status(policy)
 
     return jsonify({'status': 'success', 'policy': policy.to_dict()}), 201
 
@@ -128,5 +139,6 @@ def issue_policy(policy_id: int):
     policy.status = 'issued'
     policy.issued_at = datetime.utcnow()
     db.session.commit()
+    publish_policy_status(policy)
 
     return jsonify({'status': 'success', 'policy': policy.to_dict()}), 200
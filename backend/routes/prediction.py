@@ -1,35 +1,104 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-import pickle
+from flask_jwt_extended import verify_jwt_in_request
 import numpy as np
-import os
-import shap
 from backend.app import db
-from backend.models.user import User
 from backend.models.quote import Quote
-from backend.services.feature_mapping import extract_features, EXPECTED_FEATURES
-from backend.services.validators import validate_motor_payload, compute_vehicle_age
+from backend.services.preprocessing import get_preprocessor
+from backend.services.validators import validate_motor_payload, get_motor_validator, compute_vehicle_age
 from backend.services.reference.loader import get_motor_reference
-from backend.services.pricing_service import calculate_premium
-from backend.routes.email import send_quote_email
-from backend.routes.pdf import create_quote_pdf
+from backend.services.pricing_service import calculate_premium, calculate_premiums, premium_columns, premium_at
+from backend.services.model_registry import model_registry, RISK_MODEL
+from backend.services.quote_cache import quote_cache
+from backend.services.explain_service import explain_matrix, EXPLAIN_METHODS
+from backend.services.user_context import current_user, user_context_cache
+from backend.services.quote_jobs import enqueue_quote_jobs
+from backend.services.job_queue import job_queue
+from backend.services.mail_dispatcher import mail_dispatcher
+from backend.services.pdf_renderer import pdf_cache
+from backend.services.pdf_export import pdf_exporter
+from backend.services.event_bus import event_bus, user_topic
+from backend.services.session_store import session_store
 
 prediction_bp = Blueprint('prediction', __name__)
 
-# Load the trained XGBoost model
-model_path = os.path.join('models', 'xgboost_risk_model.pkl')
-try:
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
-    print("✅ XGBoost model loaded successfully")
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    model = None
+# Upper bound on rows accepted by /predict/batch in a single request
+MAX_BATCH_SIZE = 1000
 
 def _risk_level_from_score(score: int) -> str:
     mapping = {0: 'Low', 1: 'Medium', 2: 'High'}
     return mapping.get(score, 'Unknown')
 
+def _batch_feature_matrix(items: list) -> tuple:
+    """
+    Build one feature matrix for a batch of payloads.
+    Returns (results, X, positions): `results` has an error entry for every
+    rejected item (None otherwise) and `positions` lists (item_index, row_in_X)
+    for the items whose features are complete and numeric.
+    """
+    results = [None] * len(items)
+    dict_index = []
+    for i, data in enumerate(items):
+        if isinstance(data, dict):
+            dict_index.append(i)
+        else:
+            results[i] = {'index': i, 'status': 'error', 'error': 'Payload must be an object'}
+
+    X, missing, invalid = get_preprocessor().transform([items[i] for i in dict_index])
+    positions = []
+    for pos, i in enumerate(dict_index):
+        if missing[pos]:
+            results[i] = {'index': i, 'status': 'error',
+                          'error': f"Missing required field(s): {', '.join(missing[pos])}"}
+        elif invalid[pos]:
+            results[i] = {'index': i, 'status': 'error',
+                          'error': f"Invalid value for field(s): {', '.join(invalid[pos])}"}
+        else:
+            positions.append((i, pos))
+    return results, X, positions
+
+def _coerce_pricing_fields(data: dict) -> str | None:
+    """
+    Coerce credit_score and driving_patterns of a batch payload in place so
+    premium_columns can price it. Returns an error message if either is unusable.
+    """
+    credit_score = data.get('credit_score')
+    if credit_score is not None:
+        try:
+            data['credit_score'] = int(float(credit_score))
+        except (TypeError, ValueError, OverflowError):
+            return 'credit_score must be a number'
+
+    patterns = data.get('driving_patterns')
+    if patterns is None:
+        return None
+    if not isinstance(patterns, dict):
+        return 'driving_patterns must be an object'
+    coerced = dict(patterns)
+    for key in ('speeding_incidents', 'harsh_braking_freq', 'aggressive_acceleration'):
+        if coerced.get(key) is None:
+            continue
+        try:
+            coerced[key] = float(coerced[key])
+        except (TypeError, ValueError):
+            return f'driving_patterns.{key} must be a number'
+    data['driving_patterns'] = coerced
+    return None
+
+def _preissuance_flags(data: dict) -> tuple:
+    """Return (valuation_required, mechanical_assessment_required) from reference rules."""
+    ref = get_motor_reference()
+    rules = ref.get('issuance_rules', {})
+    cov = data.get('cover_type')
+    # Valuation for cover types
+    val_rule = rules.get('valuation', {})
+    valuation_required = bool(cov in set(val_rule.get('required_for_cover_types', [])))
+    # Mechanical assessment by vehicle age
+    mech_rule = rules.get('mechanical_assessment', {})
+    min_age = mech_rule.get('min_age')
+    veh_age = compute_vehicle_age(data.get('coverage') or {})
+    mechanical_assessment_required = bool(isinstance(min_age, int) and min_age > 0 and veh_age >= min_age)
+    return valuation_required, mechanical_assessment_required
+
 @prediction_bp.route('/predict', methods=['POST'])
 def predict():
     """
@@ -38,12 +107,14 @@ def predict():
     Request body supports flags:
       - email_send: bool (default True)
       - attach_pdf: bool (default False)
+    PDF and email are queued as background jobs; the response returns once
+    the quote is saved, with `jobs` and a `status_url` to poll.
     """
     try:
         # Enforce authentication for demo: no unauthenticated quotes
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
 
+        model = model_registry.get_risk_model()
         if model is None:
             return jsonify({
                 'error': 'Model not loaded',
@@ -53,34 +124,40 @@ def predict():
         data = request.get_json()
         data = data or {}
         
-        # Extract & validate model features
-        feature_values, missing = extract_features(data)
-        if missing:
-            return jsonify({'error': f"Missing required field(s): {', '.join(missing)}", 'status': 'error'}), 400
-        
-        # Convert to numpy array and reshape for prediction
-        X = np.array(feature_values).reshape(1, -1)
+        # Extract & validate model features into a 1xN float32 matrix
+        X, missing, invalid = get_preprocessor().transform(data)
+        if missing[0]:
+            return jsonify({'error': f"Missing required field(s): {', '.join(missing[0])}", 'status': 'error'}), 400
+        if invalid[0]:
+            return jsonify({'error': f"Invalid value for field(s): {', '.join(invalid[0])}", 'status': 'error'}), 400
         
-        # Make prediction
-        risk_prediction = model.predict(X)[0]
-        risk_score = int(risk_prediction)
+        # Make prediction (memoized on the encoded features + model version)
+        cache_key = quote_cache.key_for(X[0], model_registry.version(RISK_MODEL))
+        cached = quote_cache.get(cache_key)
+        if cached is not None:
+            risk_score = cached['risk_score']
+            confidence = cached['confidence']
+        else:
+            risk_prediction = model.predict(X)[0]
+            risk_score = int(get_preprocessor().decode_target(int(risk_prediction)))
 
-        # Confidence (best-effort)
-        confidence = None
-        try:
-            if hasattr(model, 'predict_proba'):
-                proba = model.predict_proba(X)
-                if proba is not None and len(proba.shape) == 2:
-                    confidence = float(np.max(proba[0]))
-        except Exception:
+            # Confidence (best-effort)
             confidence = None
+            try:
+                if hasattr(model, 'predict_proba'):
+                    proba = model.predict_proba(X)
+                    if proba is not None and len(proba.shape) == 2:
+                        confidence = float(np.max(proba[0]))
+            except Exception:
+                confidence = None
+            quote_cache.set(cache_key, {'risk_score': risk_score, 'confidence': confidence})
         
         # Extract enhanced risk factors if provided
         credit_score = data.get('credit_score')
         driving_patterns = data.get('driving_patterns')
         
         # Pricing engine breakdown
-        pricing = calculate_premium(risk_score, data, credit_score, driving_patterns)
+        pricing = calculate_premium(risk_score, data, credit_score, driving_patterns, data.get('add_ons'))
         quote = pricing['total']
         risk_level = _risk_level_from_score(risk_score)
         
@@ -100,7 +177,7 @@ def predict():
             return jsonify({'error': 'Invalid motor payload', 'details': details, 'status': 'error'}), 400
 
         # Save quote to authenticated user's history and optionally email/PDF
-        user = User.query.get(int(current_user_id))
+        user = current_user()
         if not user:
             return jsonify({'error': 'User not found', 'status': 'error'}), 404
 
@@ -108,17 +185,7 @@ def predict():
         attach_pdf = bool(data.get('attach_pdf', False))
 
         # Compute pre-issuance flags from reference rules
-        ref = get_motor_reference()
-        rules = ref.get('issuance_rules', {})
-        cov = data.get('cover_type')
-        # Valuation for cover types
-        val_rule = rules.get('valuation', {})
-        valuation_required = bool(cov in set(val_rule.get('required_for_cover_types', [])))
-        # Mechanical assessment by vehicle age
-        mech_rule = rules.get('mechanical_assessment', {})
-        min_age = mech_rule.get('min_age')
-        veh_age = compute_vehicle_age(data.get('coverage') or {})
-        mechanical_assessment_required = bool(isinstance(min_age, int) and min_age > 0 and veh_age >= min_age)
+        valuation_required, mechanical_assessment_required = _preissuance_flags(data)
         # expose in response
         response_data['valuation_required'] = valuation_required
         response_data['mechanical_assessment_required'] = mechanical_assessment_required
@@ -147,30 +214,17 @@ def predict():
         response_data['quote_id'] = quote_record.id
         response_data['saved_to_history'] = True
 
-        # Optionally generate PDF and send email
-        pdf_path = None
-        if attach_pdf:
-            try:
-                pdf_path = create_quote_pdf(user, quote_record, user.language_preference)
-                if pdf_path:
-                    quote_record.pdf_generated = True
-                    quote_record.pdf_path = pdf_path
-                    db.session.commit()
-                    response_data['pdf_generated'] = True
-                else:
-                    response_data['pdf_generated'] = False
-            except Exception as e:
-                print(f"PDF generation failed: {e}")
-                response_data['pdf_generated'] = False
-
-        if email_send:
-            try:
-                # extend email helper to attach pdf when available
-                success = send_quote_email(user, quote_record, user.language_preference, attachment_path=pdf_path)
-                response_data['email_sent'] = bool(success)
-            except Exception as e:
-                print(f"Email send failed: {e}")
-                response_data['email_sent'] = False
+        # PDF rendering and email run on the job queue; poll status_url for progress
+        jobs = enqueue_quote_jobs(quote_record.id, attach_pdf, email_send, user_id=user.id)
+        if jobs:
+            response_data['jobs'] = jobs
+            response_data['status_url'] = f'/api/user/quotes/{quote_record.id}/status'
+        event_bus.publish(user_topic(user.id), 'quote', {
+            'quote_id': quote_record.id,
+            'risk_level': risk_level,
+            'quote_amount': quote,
+            'jobs': jobs,
+        })
         
         return jsonify(response_data)
         
@@ -180,49 +234,226 @@ def predict():
             'status': 'error'
         }), 500
 
+@prediction_bp.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score many applicants in one model call - AUTH REQUIRED.
+    Body: { items: [payload, ...] } (a bare JSON list is also accepted).
+    Every row is validated on its own; rows that fail are reported with
+    status 'error' in `results` and do not block the rest of the batch.
+    Valid rows are priced and saved to the user's history in one transaction.
+    Batch quotes are never emailed or rendered to PDF.
+    """
+    try:
+        verify_jwt_in_request()
+
+        model = model_registry.get_risk_model()
+        if model is None:
+            return jsonify({
+                'error': 'Model not loaded',
+                'status': 'error'
+            }), 500
+
+        body = request.get_json(silent=True)
+        items = body.get('items') if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': "'items' must be a non-empty list of payloads", 'status': 'error'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} items)', 'status': 'error'}), 400
+
+        user = current_user()
+        if not user:
+            return jsonify({'error': 'User not found', 'status': 'error'}), 404
+
+        results, X_all, positions = _batch_feature_matrix(items)
+        row_index = []
+        rows = []
+
+        # Per-row motor validation against one compiled validator
+        validator = get_motor_validator()
+        for i, pos in positions:
+            data = items[i]
+            ok, details = validator.validate(data)
+            if not ok:
+                results[i] = {'index': i, 'status': 'error', 'error': 'Invalid motor payload', 'details': details}
+                continue
+            error = _coerce_pricing_fields(data)
+            if error:
+                results[i] = {'index': i, 'status': 'error', 'error': error}
+                continue
+            rows.append(pos)
+            row_index.append(i)
+
+        quote_records = []
+        if rows:
+            # One vectorized inference call for the whole batch; the class is
+            # the argmax of the probabilities so predict() is not needed.
+            X = X_all[rows]
+            proba = model.predict_proba(X)
+            best = np.argmax(proba, axis=1)
+            classes = getattr(model, 'classes_', None)
+            scores = get_preprocessor().decode_target(classes[best] if classes is not None else best)
+            confidences = proba[np.arange(len(best)), best]
+
+            # Price every row in one vectorized pass
+            premiums = calculate_premiums(scores, **premium_columns([items[i] for i in row_index]))
+
+            for k, (i, score, conf) in enumerate(zip(row_index, scores, confidences)):
+                data = items[i]
+                risk_score = int(score)
+                risk_level = _risk_level_from_score(risk_score)
+                credit_score = data.get('credit_score')
+                driving_patterns = data.get('driving_patterns')
+                pricing = premium_at(premiums, k)
+                valuation_required, mechanical_assessment_required = _preissuance_flags(data)
+
+                quote_record = Quote(
+                    user_id=user.id,
+                    input_data=data,
+                    risk_score=risk_score,
+                    risk_level=risk_level,
+                    quote_amount=pricing['total'],
+                    credit_score=credit_score,
+                    driving_patterns=driving_patterns,
+                    # motor snapshot
+                    vehicle_category=data.get('vehicle_category'),
+                    cover_type=data.get('cover_type'),
+                    add_ons=data.get('add_ons') or [],
+                    term_months=int(data.get('term_months', 12)),
+                    kyc_status='pending',
+                    valuation_required=valuation_required,
+                    mechanical_assessment_required=mechanical_assessment_required
+                )
+                quote_records.append((i, quote_record))
+                results[i] = {
+                    'index': i,
+                    'status': 'success',
+                    'risk_score': risk_score,
+                    'risk_level': risk_level,
+                    'quote': pricing['total'],
+                    'confidence': float(conf),
+                    'pricing_breakdown': pricing['breakdown'],
+                    'valuation_required': valuation_required,
+                    'mechanical_assessment_required': mechanical_assessment_required,
+                }
+
+            # Bulk insert all quotes in a single transaction
+            db.session.add_all([q for _, q in quote_records])
+            db.session.commit()
+            for i, quote_record in quote_records:
+                results[i]['quote_id'] = quote_record.id
+
+        succeeded = len(quote_records)
+        return jsonify({
+            'status': 'success',
+            'total': len(items),
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded,
+            'results': results
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
 @prediction_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
+        'model_loaded': model_registry.get_risk_model() is not None,
+        'models': model_registry.stats(),
+        'quote_cache': quote_cache.stats(),
+        'user_context_cache': user_context_cache.stats(),
+        'job_queue': job_queue.stats(),
+        'mail': mail_dispatcher.stats(),
+        'pdf_cache': pdf_cache.stats(),
+        'pdf_export': pdf_exporter.stats(),
+        'event_bus': event_bus.stats(),
+        'sessions': session_store.stats(),
         'service': 'prediction'
     })
 
+def _explain_options():
+    """Read `method` and `top_k` from the query string."""
+    method = (request.args.get('method') or 'shap').lower()
+    if method not in EXPLAIN_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(EXPLAIN_METHODS)}")
+    top_k = request.args.get('top_k', 5, type=int)
+    return method, top_k
+
 @prediction_bp.route('/risk/explain', methods=['POST'])
 def explain():
-    """Return SHAP explanations for a single payload."""
+    """Return SHAP explanations for a single payload.
+    Query params: method=shap|native|approx (default shap), top_k (default 5).
+    """
     try:
+        model = model_registry.get_risk_model()
         if model is None:
             return jsonify({'error': 'Model not loaded', 'status': 'error'}), 500
+        try:
+            method, top_k = _explain_options()
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
         payload = request.get_json() or {}
-        values, missing = extract_features(payload)
-        if missing:
-            return jsonify({'error': f"Missing required field(s): {', '.join(missing)}", 'status': 'error'}), 400
-
-        X = np.array(values).reshape(1, -1)
-        explainer = shap.TreeExplainer(model)
-        shap_values = explainer.shap_values(X)
-        base_value = explainer.expected_value
-
-        # Handle multi-class vs single output
-        if isinstance(shap_values, list):
-            # pick the class with max predicted logit/score for simplicity
-            class_index = int(np.argmax([np.dot(sv, X[0]) for sv in shap_values]))
-            sv = shap_values[class_index][0]
-            base = base_value[class_index] if isinstance(base_value, (list, np.ndarray)) else base_value
-        else:
-            sv = shap_values[0]
-            base = base_value if not isinstance(base_value, (list, np.ndarray)) else float(base_value[0])
+        X, missing, invalid = get_preprocessor().transform(payload)
+        if missing[0]:
+            return jsonify({'error': f"Missing required field(s): {', '.join(missing[0])}", 'status': 'error'}), 400
+        if invalid[0]:
+            return jsonify({'error': f"Invalid value for field(s): {', '.join(invalid[0])}", 'status': 'error'}), 400
+
+        result = explain_matrix(X, method=method, top_k=top_k)[0]
+
+        return jsonify({
+            'status': 'success',
+            'method': method,
+            'base_value': result['base_value'],
+            'top_contributions': result['top_contributions']
+        }), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+@prediction_bp.route('/risk/explain/batch', methods=['POST'])
+def explain_batch():
+    """Explain many payloads with a single explainer call.
+    Body: { items: [payload, ...] } (a bare JSON list is also accepted).
+    Query params: method=shap|native|approx (default shap), top_k (default 5).
+    Rows with missing or non-numeric features are reported individually.
+    """
+    try:
+        model = model_registry.get_risk_model()
+        if model is None:
+            return jsonify({'error': 'Model not loaded', 'status': 'error'}), 500
+        try:
+            method, top_k = _explain_options()
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+
+        body = request.get_json(silent=True)
+        items = body.get('items') if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': "'items' must be a non-empty list of payloads", 'status': 'error'}), 400
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} items)', 'status': 'error'}), 400
+
+        results, X_all, positions = _batch_feature_matrix(items)
+        row_index = [i for i, _ in positions]
 
-        contribs = [{'feature': name, 'shap_value': float(val), 'abs': float(abs(val))}
-                    for name, val in zip(EXPECTED_FEATURES, sv)]
-        top = sorted(contribs, key=lambda x: x['abs'], reverse=True)[:5]
+        if positions:
+            explained = explain_matrix(X_all[[pos for _, pos in positions]], method=method, top_k=top_k)
+            for i, result in zip(row_index, explained):
+                results[i] = {'index': i, 'status': 'success', **result}
 
         return jsonify({
             'status': 'success',
-            'base_value': float(base),
-            'top_contributions': top
+            'method': method,
+            'total': len(items),
+            'succeeded': len(row_index),
+            'failed': len(items) - len(row_index),
+            'results': results
         }), 200
     except Exception as e:
-        return jsonify({'status': 'error', 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'status': 'error', 'error': str(e)}), 500
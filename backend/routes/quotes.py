@@ -1,34 +1,58 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from backend.app import db
-from backend.models.user import User
 from backend.models.quote import Quote
-from sqlalchemy import desc
+from sqlalchemy import desc, func, or_, and_
+from datetime import datetime, timedelta
 from backend.services.pricing_service import calculate_premium
 from backend.services.feature_mapping import extract_features
-import numpy as np
-import pickle
-import os
+from backend.services.user_context import current_user
+from backend.services.quote_jobs import quote_job_status
+import base64
 
 quotes_bp = Blueprint('quotes', __name__)
 
+def _encode_cursor(created_at, quote_id):
+    # Rows without created_at sort last (NULLS LAST) and are encoded as datetime.min
+    raw = f"{(created_at or datetime.min).isoformat()}|{quote_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    """Return (created_at, id) from an opaque cursor; raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, quote_id = base64.urlsafe_b64decode(padded).decode('utf-8').rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(quote_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
 @quotes_bp.route('/user/quotes', methods=['GET'])
 @jwt_required()
 def get_user_quotes():
-    """Get all quotes for the authenticated user"""
+    """Get all quotes for the authenticated user.
+    List entries are summaries (no input_data); use /user/quotes/<id> for the full quote.
+
+    Two pagination modes:
+      - page/per_page: classic OFFSET pagination with totals
+      - cursor/limit: keyset pagination on (created_at, id). Pass an empty
+        cursor for the first page, then `next_cursor` from each response.
+        Add include_total=true to also get the total count.
+    """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        if 'cursor' in request.args:
+            return _get_user_quotes_keyset(user)
+        
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)  # Max 100 per page
         
         # Query quotes with pagination
-        quotes_query = Quote.query.filter_by(user_id=user.id).order_by(desc(Quote.created_at))
+        quotes_query = Quote.summary_query().filter(Quote.user_id == user.id).order_by(desc(Quote.created_at))
         quotes_paginated = quotes_query.paginate(
             page=page, 
             per_page=per_page, 
@@ -36,7 +60,7 @@ def get_user_quotes():
         )
         
         # Convert to dict format
-        quotes_data = [quote.to_dict() for quote in quotes_paginated.items]
+        quotes_data = [Quote.summary_to_dict(row) for row in quotes_paginated.items]
         
         return jsonify({
             'quotes': quotes_data,
@@ -53,13 +77,52 @@ def get_user_quotes():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _get_user_quotes_keyset(user):
+    """Keyset-paginated quote summaries, newest first; constant cost at any depth."""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    cursor = request.args.get('cursor') or ''
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    
+    query = Quote.summary_query().filter(Quote.user_id == user.id)
+    if cursor:
+        try:
+            after_created, after_id = _decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if after_created == datetime.min:
+            query = query.filter(Quote.created_at.is_(None), Quote.id < after_id)
+        else:
+            query = query.filter(or_(
+                Quote.created_at < after_created,
+                and_(Quote.created_at == after_created, Quote.id < after_id),
+                Quote.created_at.is_(None)
+            ))
+    
+    # Fetch one extra row to learn whether another page exists
+    # NULLS LAST explicitly: PostgreSQL sorts NULLs first under DESC, SQLite last
+    rows = query.order_by(desc(Quote.created_at).nullslast(), desc(Quote.id)).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    
+    pagination = {
+        'limit': limit,
+        'has_next': has_next,
+        'next_cursor': _encode_cursor(rows[-1].created_at, rows[-1].id) if has_next else None
+    }
+    if include_total:
+        pagination['total'] = db.session.query(func.count(Quote.id)).filter(Quote.user_id == user.id).scalar()
+    
+    return jsonify({
+        'quotes': [Quote.summary_to_dict(row) for row in rows],
+        'pagination': pagination
+    }), 200
+
 @quotes_bp.route('/user/quotes/<int:quote_id>', methods=['GET'])
 @jwt_required()
 def get_user_quote(quote_id):
     """Get a specific quote for the authenticated user"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -77,13 +140,32 @@ def get_user_quote(quote_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@quotes_bp.route('/user/quotes/<int:quote_id>/status', methods=['GET'])
+@jwt_required()
+def get_quote_status(quote_id):
+    """Progress of a quote's queued PDF/email jobs (poll after /api/predict)"""
+    try:
+        user = current_user()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        quote = Quote.query.filter_by(id=quote_id, user_id=user.id).first()
+        
+        if not quote:
+            return jsonify({'error': 'Quote not found'}), 404
+        
+        return jsonify(quote_job_status(quote)), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @quotes_bp.route('/user/quotes/<int:quote_id>', methods=['DELETE'])
 @jwt_required()
 def delete_user_quote(quote_id):
     """Delete a specific quote for the authenticated user"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -105,54 +187,106 @@ def delete_user_quote(quote_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _month_bucket(column):
+    """SQL expression truncating a timestamp to 'YYYY-MM' for the active dialect."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(func.date_trunc('month', column), 'YYYY-MM')
+    return func.strftime('%Y-%m', column)
+
+def _parse_date_arg(name):
+    """Parse an optional ISO date/datetime query parameter.
+    Returns (value, date_only) or (None, False); raises ValueError if malformed.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None, False
+    try:
+        return datetime.fromisoformat(value), 'T' not in value and ' ' not in value
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' date; use ISO-8601 (YYYY-MM-DD)")
+
+def _summarize(groups):
+    """Fold (risk_level, count, sum, min, max) groups into the stats shape."""
+    total = sum(g[1] for g in groups)
+    distribution = {'Low': 0, 'Medium': 0, 'High': 0}
+    for level, count, _, _, _ in groups:
+        if level in distribution:
+            distribution[level] += count
+    if not total:
+        return {
+            'total_quotes': 0,
+            'average_quote': 0,
+            'lowest_quote': 0,
+            'highest_quote': 0,
+            'risk_distribution': distribution
+        }
+    return {
+        'total_quotes': total,
+        'average_quote': round(sum(g[2] for g in groups) / total),
+        'lowest_quote': min(g[3] for g in groups),
+        'highest_quote': max(g[4] for g in groups),
+        'risk_distribution': distribution
+    }
+
 @quotes_bp.route('/user/quotes/stats', methods=['GET'])
 @jwt_required()
 def get_user_quote_stats():
-    """Get quote statistics for the authenticated user"""
+    """Get quote statistics for the authenticated user.
+    Query params (optional):
+      - from, to: ISO dates bounding created_at (to is inclusive of the whole day)
+      - breakdown=month: add a per-month breakdown
+    All figures come from one GROUP BY query; no quote rows are loaded.
+    """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get all user quotes
-        quotes = Quote.query.filter_by(user_id=user.id).all()
-        
-        if not quotes:
-            return jsonify({
-                'stats': {
-                    'total_quotes': 0,
-                    'average_quote': 0,
-                    'lowest_quote': 0,
-                    'highest_quote': 0,
-                    'risk_distribution': {
-                        'Low': 0,
-                        'Medium': 0,
-                        'High': 0
-                    }
-                }
-            }), 200
-        
-        # Calculate statistics
-        quote_amounts = [q.quote_amount for q in quotes]
-        risk_levels = [q.risk_level for q in quotes]
-        
-        stats = {
-            'total_quotes': len(quotes),
-            'average_quote': round(sum(quote_amounts) / len(quote_amounts)),
-            'lowest_quote': min(quote_amounts),
-            'highest_quote': max(quote_amounts),
-            'risk_distribution': {
-                'Low': risk_levels.count('Low'),
-                'Medium': risk_levels.count('Medium'),
-                'High': risk_levels.count('High')
-            }
-        }
+        try:
+            date_from, _ = _parse_date_arg('from')
+            date_to, to_date_only = _parse_date_arg('to')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        monthly = request.args.get('breakdown') == 'month'
         
-        return jsonify({
-            'stats': stats
-        }), 200
+        # Aggregate in SQL: one row per risk level (and month when requested)
+        group_cols = [Quote.risk_level]
+        if monthly:
+            group_cols.append(_month_bucket(Quote.created_at).label('month'))
+        query = db.session.query(
+            *group_cols,
+            func.count(Quote.id),
+            func.sum(Quote.quote_amount),
+            func.min(Quote.quote_amount),
+            func.max(Quote.quote_amount),
+        ).filter(Quote.user_id == user.id)
+        if date_from:
+            query = query.filter(Quote.created_at >= date_from)
+        if date_to and to_date_only:
+            # A bare date includes that whole day
+            query = query.filter(Quote.created_at < date_to + timedelta(days=1))
+        elif date_to:
+            query = query.filter(Quote.created_at <= date_to)
+        rows = query.group_by(*group_cols).all()
+        
+        if monthly:
+            by_month = {}
+            for level, month, count, total, low, high in rows:
+                by_month.setdefault(month, []).append((level, count, total, low, high))
+            groups = [g for month_groups in by_month.values() for g in month_groups]
+        else:
+            groups = [tuple(r) for r in rows]
+        
+        response = {
+            'stats': _summarize(groups)
+        }
+        if monthly:
+            response['monthly'] = [
+                {'month': month, **_summarize(by_month[month])}
+                for month in sorted(by_month)
+            ]
+        return jsonify(response), 200
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -1,8 +1,14 @@
-from flask import Blueprint, jsonify
-from backend.services.reference.loader import get_motor_reference
+from flask import Blueprint, Response, request
+from backend.services.reference.loader import get_motor_reference_snapshot
 
 reference_bp = Blueprint('reference', __name__)
 
 @reference_bp.route('/reference/motor', methods=['GET'])
 def get_motor_reference_route():
-    return jsonify(get_motor_reference()), 200
+    """Serve the pre-serialized motor reference; honours If-None-Match with 304."""
+    snapshot = get_motor_reference_snapshot()
+    response = Response(snapshot.body, mimetype='application/json')
+    response.set_etag(snapshot.version)
+    # Clients may cache but must revalidate so tariff updates show up immediately
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
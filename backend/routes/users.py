@@ -1,11 +1,12 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from sqlalchemy import desc
 
 from backend.app import db
-from backend.models.user import User
 from backend.models.quote import Quote
 from backend.models.policy import Policy
+from backend.services.user_context import current_user
+from backend.routes.policies import publish_policy_status
 
 users_bp = Blueprint('users', __name__)
 
@@ -30,8 +31,7 @@ def submit_kyc():
     if not national_id or not dob:
         return jsonify({'error': 'national_id and dob are required'}), 400
 
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    user = current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
@@ -72,10 +72,9 @@ def verify_kyc_dev():
     DEV-ONLY: Mark the current user's latest quote and policy KYC as 'verified'.
     This is intended for demos to unblock policy issuance.
     """
-    user_id = int(get_jwt_identity())
     body = request.get_json() or {}
     policy_id = body.get('policy_id')
-    user = User.query.get(user_id)
+    user = current_user()
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
@@ -99,5 +98,7 @@ def verify_kyc_dev():
             policy.kyc_status = 'verified'
 
     db.session.commit()
+    if policy:
+        publish_policy_status(policy)
 
     return jsonify({'status': 'success', 'message': 'KYC marked as verified (dev)', 'policy_id': getattr(policy, 'id', None)}), 200
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+
+def is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def _is_memory_sqlite(uri: str) -> bool:
+    database = make_url(uri).database
+    return not database or database == ':memory:'
+
+
+def engine_options(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS derived from the DB_* / SQLITE_* config keys.
+    SQLite gets a busy timeout on the driver connection; server databases
+    get pool sizing, recycle and pre-ping.
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if is_sqlite(uri):
+        return {'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000.0}}
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+
+
+def sqlite_pragmas(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """PRAGMAs applied to every new SQLite connection (None values are skipped)."""
+    pragmas = {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'foreign_keys': 'ON' if config.get('SQLITE_FOREIGN_KEYS') else None,
+    }
+    if _is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        # WAL and mmap do not apply to in-memory databases
+        pragmas.pop('journal_mode')
+        pragmas.pop('mmap_size')
+    return {k: v for k, v in pragmas.items() if v is not None}
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Mapping[str, Any]) -> None:
+    """Run the PRAGMAs on each DBAPI connection as the pool opens it."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
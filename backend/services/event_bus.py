@@ -0,0 +1,142 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+
+def conversation_topic(conversation_id: str) -> str:
+    return f'conversation:{conversation_id}'
+
+
+def user_topic(user_id: int) -> str:
+    return f'user:{user_id}'
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    topic: str
+    type: str
+    data: Dict[str, Any]
+    created_at: float = field(default_factory=time.time)
+
+    def to_sse(self) -> str:
+        """Server-Sent Events wire format."""
+        return f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n'
+
+
+class Subscription:
+    """One listener's bounded inbox. If it fills up, new events are dropped and `overflowed` is set."""
+
+    def __init__(self, bus: 'EventBus', topics: Set[str], queue_size: int):
+        self.bus = bus
+        self.topics = topics
+        self._queue: 'queue.Queue[Event]' = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def deliver(self, event: Event) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for pushing progress to SSE streams.
+
+    Events are published to string topics ('conversation:<id>', 'user:<id>')
+    and fanned out to every current subscriber of that topic. Each topic keeps
+    its last `history` events so a reconnecting client can pass Last-Event-ID
+    and get what it missed; only the `max_topics` most recently published
+    topics keep that buffer. No external broker is involved; publishers and
+    streams must share the process (one app process, threaded server).
+    """
+
+    def __init__(self, history: int = 100, queue_size: int = 100, max_topics: int = 10000):
+        self.history = history
+        self.queue_size = queue_size
+        self.max_topics = max_topics
+        self._ids = itertools.count(1)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._recent: 'OrderedDict[str, Deque[Event]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def configure(self, history: Optional[int] = None, queue_size: Optional[int] = None) -> None:
+        with self._lock:
+            if history is not None:
+                self.history = int(history)
+                self._recent.clear()
+            if queue_size is not None:
+                self.queue_size = int(queue_size)
+
+    def publish(self, topic: str, type: str, data: Dict[str, Any]) -> Event:
+        with self._lock:
+            event = Event(next(self._ids), topic, type, data)
+            recent = self._recent.get(topic)
+            if recent is None:
+                recent = self._recent[topic] = deque(maxlen=self.history)
+                if len(self._recent) > self.max_topics:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(topic)
+            recent.append(event)
+            subscribers = list(self._subscribers.get(topic, ()))
+            self.published += 1
+            self.delivered += len(subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[int] = None) -> Subscription:
+        """Listen on `topics`; with last_event_id, first replay buffered events newer than it."""
+        subscription = Subscription(self, set(topics), self.queue_size)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+            if last_event_id is not None:
+                missed: List[Event] = sorted(
+                    (e for topic in subscription.topics for e in self._recent.get(topic, ()) if e.id > last_event_id),
+                    key=lambda e: e.id,
+                )
+                for event in missed:
+                    subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'topics_with_subscribers': len(self._subscribers),
+                'subscriptions': len({s for subs in self._subscribers.values() for s in subs}),
+                'buffered_topics': len(self._recent),
+                'published': self.published,
+                'delivered': self.delivered,
+            }
+
+
+# Global bus; history and per-subscriber queue size set from app config in create_app
+event_bus = EventBus()
@@ -0,0 +1,96 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.feature_mapping import EXPECTED_FEATURES
+from backend.services.model_registry import model_registry, RISK_MODEL
+
+# Supported explanation methods:
+#   shap   - exact TreeSHAP via a cached shap.TreeExplainer
+#   native - exact TreeSHAP computed inside XGBoost (pred_contribs)
+#   approx - XGBoost's approximate (Saabas) contributions, fastest
+EXPLAIN_METHODS = ('shap', 'native', 'approx')
+
+_lock = threading.Lock()
+_explainers: Dict[str, Any] = {}
+
+
+def get_explainer() -> Optional[Any]:
+    """Return a TreeExplainer for the currently loaded model, built once per model version."""
+    model = model_registry.get_risk_model()
+    if model is None:
+        return None
+    version = model_registry.version(RISK_MODEL)
+    explainer = _explainers.get(version)
+    if explainer is not None:
+        return explainer
+    with _lock:
+        if version not in _explainers:
+            import shap
+            # Explainers for older model versions are no longer reachable
+            _explainers.clear()
+            _explainers[version] = shap.TreeExplainer(model)
+        return _explainers[version]
+
+
+def _shap_contributions(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    explainer = get_explainer()
+    shap_values = explainer.shap_values(X)
+    base_value = explainer.expected_value
+    n = X.shape[0]
+
+    # Handle multi-class vs single output
+    if isinstance(shap_values, list):
+        # pick the class with max predicted logit/score for simplicity
+        class_index = np.array([int(np.argmax([np.dot(sv[r], X[r]) for sv in shap_values])) for r in range(n)])
+        contribs = np.stack([shap_values[c][r] for r, c in enumerate(class_index)])
+        bases = np.asarray(base_value, dtype=float)[class_index]
+    elif np.ndim(shap_values) == 3:
+        # (rows, features, classes) layout used by newer shap releases
+        class_index = np.argmax(np.einsum('rfc,rf->rc', shap_values, X), axis=1)
+        contribs = shap_values[np.arange(n), :, class_index]
+        bases = np.asarray(base_value, dtype=float)[class_index]
+    else:
+        contribs = np.asarray(shap_values)
+        base = base_value if not isinstance(base_value, (list, np.ndarray)) else float(np.ravel(base_value)[0])
+        bases = np.full(n, float(base))
+    return contribs, bases
+
+
+def _native_contributions(X: np.ndarray, approx: bool) -> Tuple[np.ndarray, np.ndarray]:
+    import xgboost as xgb
+    model = model_registry.get_risk_model()
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    dmatrix = xgb.DMatrix(X, feature_names=booster.feature_names or None)
+    out = booster.predict(dmatrix, pred_contribs=True, approx_contribs=approx)
+    if out.ndim == 3:
+        # (rows, classes, features + bias): keep the class with the largest margin
+        class_index = np.argmax(out.sum(axis=2), axis=1)
+        out = out[np.arange(out.shape[0]), class_index, :]
+    # The last column is the bias term (expected value)
+    return out[:, :-1], out[:, -1]
+
+
+def explain_matrix(X: np.ndarray, method: str = 'shap', top_k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Explain every row of X in one call.
+    Returns one {base_value, top_contributions} dict per row.
+    """
+    if method == 'shap':
+        contribs, bases = _shap_contributions(X)
+    else:
+        contribs, bases = _native_contributions(X, approx=(method == 'approx'))
+
+    results: List[Dict[str, Any]] = []
+    abs_contribs = np.abs(contribs)
+    k = max(1, min(int(top_k), len(EXPECTED_FEATURES)))
+    # Top-k per row without a full Python sort of every feature
+    top_idx = np.argsort(-abs_contribs, axis=1, kind='stable')[:, :k]
+    for r in range(contribs.shape[0]):
+        top = [{'feature': EXPECTED_FEATURES[j],
+                'shap_value': float(contribs[r, j]),
+                'abs': float(abs_contribs[r, j])}
+               for j in top_idx[r]]
+        results.append({'base_value': float(bases[r]), 'top_contributions': top})
+    return results
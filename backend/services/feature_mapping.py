@@ -1,4 +1,7 @@
-from typing import List, Tuple, Any, Dict
+from dataclasses import dataclass
+from typing import Callable, List, Tuple, Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
 
 # Single source of truth for model input order
 EXPECTED_FEATURES: List[str] = [
@@ -9,11 +12,104 @@ EXPECTED_FEATURES: List[str] = [
     'CLM_FREQ', 'REVOKED', 'MVR_PTS', 'CLM_AMT', 'CAR_AGE', 'URBANICITY'
 ]
 
+# XGBoost converts its input to float32 internally, so build it that way up front
+FEATURE_DTYPE = np.float32
+
+# encode(feature_name, raw_values) -> (codes, ok_mask)
+ColumnEncoder = Callable[[str, List[Any]], Tuple[np.ndarray, np.ndarray]]
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    name: str
+    column: int
+    dtype: Any = FEATURE_DTYPE
+    default: Optional[float] = None  # None means the field is required
+
+
+class FeatureSchema:
+    """
+    Compiled view of the model's input features.
+    Built once at import time; maps each feature name to its column and
+    writes payload values straight into a preallocated float32 matrix.
+    """
+
+    def __init__(self, features: Sequence[str], defaults: Optional[Dict[str, float]] = None):
+        defaults = defaults or {}
+        self.specs: Tuple[FeatureSpec, ...] = tuple(
+            FeatureSpec(name=name, column=i, default=defaults.get(name))
+            for i, name in enumerate(features)
+        )
+        self.names: Tuple[str, ...] = tuple(features)
+        self.index: Dict[str, int] = {spec.name: spec.column for spec in self.specs}
+        self.n_features = len(self.specs)
+        # Flat tuple for the hot loop: avoids attribute lookups per value
+        self._columns = tuple((spec.name, spec.column, spec.default) for spec in self.specs)
+
+    def build_matrix(self, payloads: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]],
+                     encode: Optional[ColumnEncoder] = None
+                     ) -> Tuple[np.ndarray, List[List[str]], List[List[str]]]:
+        """
+        Build a C-contiguous (n_rows, n_features) float32 matrix.
+        Accepts a single payload dict or a list of them.
+        Returns (X, missing, invalid) where missing/invalid hold the offending
+        field names per row (null counts as missing). Offending cells are NaN.
+
+        When `encode` is given, non-numeric values are collected per column and
+        handed to it in one call per column: encode(name, values) must return
+        (codes, ok_mask) arrays aligned with `values`.
+        """
+        rows = [payloads] if isinstance(payloads, Mapping) else payloads
+        X = np.empty((len(rows), self.n_features), dtype=FEATURE_DTYPE)
+        missing: List[List[str]] = []
+        invalid: List[List[str]] = []
+        # column -> ([row indices], [raw values]) awaiting batch encoding
+        pending: Dict[int, Tuple[List[int], List[Any]]] = {}
+
+        for r, payload in enumerate(rows):
+            row = X[r]
+            row_missing: List[str] = []
+            row_invalid: List[str] = []
+            for name, col, default in self._columns:
+                value = payload.get(name)
+                if value is None:
+                    if default is None:
+                        row_missing.append(name)
+                        row[col] = np.nan
+                        continue
+                    value = default
+                try:
+                    row[col] = value
+                except (TypeError, ValueError):
+                    row[col] = np.nan
+                    if encode is not None and isinstance(value, str):
+                        rows_idx, values = pending.setdefault(col, ([], []))
+                        rows_idx.append(r)
+                        values.append(value)
+                    else:
+                        row_invalid.append(name)
+            missing.append(row_missing)
+            invalid.append(row_invalid)
+
+        for col, (rows_idx, values) in pending.items():
+            name = self.names[col]
+            codes, ok = encode(name, values)
+            idx = np.asarray(rows_idx)
+            X[idx[ok], col] = codes[ok]
+            for r in idx[~ok]:
+                invalid[r].append(name)
+        return X, missing, invalid
+
+
+# Compiled once; shared by every route and service
+FEATURE_SCHEMA = FeatureSchema(EXPECTED_FEATURES)
+
 
 def extract_features(payload: Dict[str, Any]) -> Tuple[List[float], List[str]]:
     """
     Validates and orders features from payload according to EXPECTED_FEATURES.
     Returns (values, missing_features)
+    Prefer FEATURE_SCHEMA.build_matrix for model input; this keeps raw values.
     """
     values: List[float] = []
     missing: List[str] = []
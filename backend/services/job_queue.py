@@ -0,0 +1,373 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class QueueFull(Exception):
+    """Raised by enqueue() when the number of pending jobs hits the bound."""
+
+
+class RetryJob(Exception):
+    """Raise from a handler to retry after `delay` seconds without it counting as an error."""
+
+    def __init__(self, message: str = '', delay: float | None = None):
+        super().__init__(message)
+        self.delay = delay
+
+
+class JobQueue:
+    """
+    Bounded, persistent job queue for post-quote side effects (PDF, email).
+
+    Jobs live in a small SQLite file so they survive restarts and can be
+    shared by every worker process on the host. Each process runs a fixed
+    pool of worker threads that claim jobs with a short lease; a job whose
+    lease expires (worker crashed) is picked up again. Failed jobs are
+    retried with exponential backoff up to `max_attempts`. Done and failed
+    jobs are kept for `retention_seconds` (for status lookups) and then
+    deleted by an idle worker.
+
+    A job may carry a dedupe key (e.g. 'quote_pdf:42'): while a job with
+    that key is queued or running, enqueueing it again returns the
+    existing job instead of adding a second one.
+    """
+
+    def __init__(self, path: str | None = None, workers: int = 2, max_pending: int = 1000,
+                 max_attempts: int = 5, backoff_base: float = 2.0, backoff_max: float = 300.0,
+                 lease_seconds: float = 300.0, poll_interval: float = 1.0,
+                 retention_seconds: float = 7 * 24 * 3600, purge_interval: float = 600.0):
+        self.path = path
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._listeners: List[Callable[[Dict[str, Any], str, Optional[str]], None]] = []
+        self._app = None
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    # -- setup -------------------------------------------------------------
+
+    def init_app(self, app, start: bool = True) -> None:
+        """Configure from app config and (with `start`) start the worker pool."""
+        self._app = app
+        cfg = app.config
+        self.path = cfg.get('JOB_QUEUE_PATH') or os.path.join(app.instance_path, 'jobs.db')
+        self.workers = int(cfg.get('JOB_QUEUE_WORKERS', self.workers))
+        self.max_pending = int(cfg.get('JOB_QUEUE_MAX_PENDING', self.max_pending))
+        self.max_attempts = int(cfg.get('JOB_QUEUE_MAX_ATTEMPTS', self.max_attempts))
+        self.backoff_base = float(cfg.get('JOB_QUEUE_BACKOFF_BASE', self.backoff_base))
+        self.retention_seconds = float(cfg.get('JOB_QUEUE_RETENTION_SECONDS', self.retention_seconds))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._schema_ready = False
+        self._ensure_schema()
+        if start:
+            self.start()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register the function that runs jobs of `kind`; it receives the payload dict."""
+        self._handlers[kind] = handler
+
+    def add_listener(self, listener: Callable[[Dict[str, Any], str, Optional[str]], None]) -> None:
+        """Call `listener(job, status, error)` whenever a job ends as done or failed."""
+        self._listeners.append(listener)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' kind TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' dedupe_key TEXT,'
+            ' status TEXT NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' max_attempts INTEGER NOT NULL,'
+            ' run_after REAL NOT NULL,'
+            ' locked_until REAL,'
+            ' last_error TEXT,'
+            ' created_at REAL NOT NULL,'
+            ' updated_at REAL NOT NULL)'
+        )
+        # At most one active job per dedupe key
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_active_dedupe ON jobs (dedupe_key) "
+            "WHERE status IN ('queued', 'running') AND dedupe_key IS NOT NULL"
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_dedupe_key ON jobs (dedupe_key, id)')
+        self._schema_ready = True
+
+    # -- producer API ------------------------------------------------------
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: str | None = None,
+                delay: float = 0.0) -> Dict[str, Any]:
+        """
+        Add a job and wake a worker. Returns the job as a dict (the existing
+        one if `dedupe_key` is already active). Raises QueueFull when
+        `max_pending` jobs are waiting.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f'No handler registered for job kind {kind!r}')
+        self._ensure_schema()
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if dedupe_key is not None:
+                existing = self._active_by_key(conn, dedupe_key)
+                if existing is not None:
+                    conn.execute('COMMIT')
+                    return existing
+            pending = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status = ?', (QUEUED,)
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFull(f'Job queue is full ({pending} pending)')
+            cur = conn.execute(
+                'INSERT INTO jobs (kind, payload, dedupe_key, status, attempts, max_attempts,'
+                ' run_after, created_at, updated_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)',
+                (kind, json.dumps(payload), dedupe_key, QUEUED, self.max_attempts, now + delay, now, now),
+            )
+            job_id = cur.lastrowid
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(f'SELECT {_COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def latest_for_keys(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Most recent job per dedupe key (active or finished)."""
+        self._ensure_schema()
+        conn = self._conn()
+        result = {}
+        for key in keys:
+            row = conn.execute(
+                f'SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ? ORDER BY id DESC LIMIT 1', (key,)
+            ).fetchone()
+            if row:
+                result[key] = _row_to_dict(row)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.path:
+            return {'enabled': False}
+        self._ensure_schema()
+        counts = dict(self._conn().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {
+            'enabled': True,
+            'workers': len([t for t in self._threads if t.is_alive()]),
+            'max_pending': self.max_pending,
+            **{state: counts.get(state, 0) for state in (QUEUED, RUNNING, DONE, FAILED)},
+        }
+
+    @staticmethod
+    def _active_by_key(conn: sqlite3.Connection, key: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            f'SELECT {_COLUMNS} FROM jobs WHERE dedupe_key = ? AND status IN (?, ?)',
+            (key, *ACTIVE_STATES),
+        ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    # -- workers -----------------------------------------------------------
+
+    def start(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            self._stop.clear()
+            worker_tag = uuid.uuid4().hex[:6]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run, name=f'job-worker-{worker_tag}-{len(self._threads)}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_pending(self, limit: int | None = None) -> int:
+        """Run due jobs on the calling thread (scripts/tests). Returns how many ran."""
+        ran = 0
+        while limit is None or ran < limit:
+            job = self._claim()
+            if job is None:
+                break
+            self._execute(job)
+            ran += 1
+        return ran
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error as e:
+                print(f"❌ Job queue error: {e}")
+                job = None
+            if job is None:
+                self._maybe_purge()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(job)
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the next due job (queued, or running with an expired lease)."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                f'SELECT {_COLUMNS} FROM jobs '
+                'WHERE (status = ? AND run_after <= ?) OR (status = ? AND locked_until < ?) '
+                'ORDER BY run_after, id LIMIT 1',
+                (QUEUED, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            job = _row_to_dict(row)
+            conn.execute(
+                'UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ? WHERE id = ?',
+                (RUNNING, now + self.lease_seconds, now, job['id']),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        job['attempts'] += 1
+        job['status'] = RUNNING
+        return job
+
+    def _execute(self, job: Dict[str, Any]) -> None:
+        handler = self._handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for job kind {job['kind']!r}")
+            if self._app is not None:
+                with self._app.app_context():
+                    handler(job['payload'])
+            else:
+                handler(job['payload'])
+        except RetryJob as e:
+            self._reschedule(job, str(e), e.delay, count_attempt=False)
+        except Exception as e:
+            print(f"❌ Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            self._reschedule(job, str(e), None)
+        else:
+            self._finish(job, DONE, None)
+
+    def _reschedule(self, job: Dict[str, Any], error: str, delay: float | None, count_attempt: bool = True) -> None:
+        attempts = job['attempts'] if count_attempt else job['attempts'] - 1
+        if count_attempt and attempts >= job['max_attempts']:
+            self._finish(job, FAILED, error)
+            return
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+            delay *= random.uniform(0.8, 1.2)  # jitter so retries from many jobs spread out
+        now = time.time()
+        self._conn().execute(
+            'UPDATE jobs SET status = ?, attempts = ?, run_after = ?, locked_until = NULL,'
+            ' last_error = ?, updated_at = ? WHERE id = ?',
+            (QUEUED, attempts, now + delay, error, now, job['id']),
+        )
+
+    def purge(self, older_than: float) -> int:
+        """Delete done and failed jobs last updated before the `older_than` epoch time."""
+        cursor = self._conn().execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+            (DONE, FAILED, older_than),
+        )
+        return cursor.rowcount
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.purge_interval
+        try:
+            self.purge(now - self.retention_seconds)
+        except sqlite3.Error as e:
+            print(f"❌ Job queue purge error: {e}")
+
+    def _finish(self, job: Dict[str, Any], status: str, error: str | None) -> None:
+        now = time.time()
+        self._conn().execute(
+            'UPDATE jobs SET status = ?, locked_until = NULL, last_error = ?, updated_at = ? WHERE id = ?',
+            (status, error, now, job['id']),
+        )
+        for listener in self._listeners:
+            try:
+                listener(job, status, error)
+            except Exception as e:
+                print(f"❌ Job listener failed for job {job['id']}: {e}")
+
+
+_COLUMNS = 'id, kind, payload, dedupe_key, status, attempts, max_attempts, run_after, last_error, created_at, updated_at'
+
+
+def _row_to_dict(row: tuple) -> Dict[str, Any]:
+    (job_id, kind, payload, dedupe_key, status, attempts, max_attempts,
+     run_after, last_error, created_at, updated_at) = row
+    return {
+        'id': job_id,
+        'kind': kind,
+        'payload': json.loads(payload),
+        'dedupe_key': dedupe_key,
+        'status': status,
+        'attempts': attempts,
+        'max_attempts': max_attempts,
+        'run_after': run_after,
+        'last_error': last_error,
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
+
+
+# Global queue instance; configured and started in create_app
+job_queue = JobQueue()
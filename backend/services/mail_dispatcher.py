@@ -0,0 +1,196 @@
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Tuple
+
+from backend.app import mail
+
+
+class MailQueueFull(Exception):
+    """Raised by submit() when the outbound queue is at capacity."""
+
+
+class _TokenBucket:
+    """Shared send-rate limit (messages per second, with a burst allowance)."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class MailDispatcher:
+    """
+    Outbound mail with a fixed pool of sender threads.
+
+    Messages go into a bounded queue; submit() raises MailQueueFull instead
+    of growing it without limit. Each worker keeps one SMTP connection open,
+    drains up to `batch_size` queued messages per wake-up and sends them over
+    that connection, and closes it after `idle_timeout` seconds without work.
+    A dropped connection is reopened and the message retried once. Sends are
+    throttled by a shared token bucket (`rate_limit` messages/second).
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 500, batch_size: int = 20,
+                 rate_limit: float = 10.0, burst: int = 20, idle_timeout: float = 30.0):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._queue: 'queue.Queue[Tuple[Any, Future, float]]' = queue.Queue(maxsize=queue_size)
+        self._limiter = _TokenBucket(rate_limit, burst)
+        self._app = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=1000)  # enqueue -> sent, ms
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.connections_opened = 0
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self._app = app
+        self.workers = int(cfg.get('MAIL_WORKERS', self.workers))
+        self.batch_size = int(cfg.get('MAIL_BATCH_SIZE', self.batch_size))
+        self.idle_timeout = float(cfg.get('MAIL_IDLE_TIMEOUT', self.idle_timeout))
+        self._queue = queue.Queue(maxsize=int(cfg.get('MAIL_QUEUE_SIZE', self._queue.maxsize)))
+        self._limiter = _TokenBucket(float(cfg.get('MAIL_RATE_LIMIT', self._limiter.rate)),
+                                     int(cfg.get('MAIL_RATE_BURST', self._limiter.capacity)))
+
+    def submit(self, msg, timeout: float | None = None) -> Future:
+        """
+        Queue a flask_mail.Message. Returns a Future that resolves when the
+        message has been handed to the SMTP server (or raises its error).
+        Waits up to `timeout` seconds for queue space (default: no wait).
+        """
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            if timeout:
+                self._queue.put((msg, future, time.monotonic()), timeout=timeout)
+            else:
+                self._queue.put_nowait((msg, future, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise MailQueueFull(f'Mail queue is full ({self._queue.maxsize} messages)')
+        return future
+
+    def _ensure_started(self) -> None:
+        if len(self._threads) >= self.workers and all(t.is_alive() for t in self._threads):
+            return
+        if self._app is None:
+            raise RuntimeError('MailDispatcher.init_app() has not been called')
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f'mail-sender-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_batch(self, timeout: float) -> List[Tuple[Any, Future, float]]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        with self._app.app_context():
+            conn = None
+            while True:
+                batch = self._next_batch(self.idle_timeout)
+                if not batch:
+                    conn = self._close(conn)  # idle: release the SMTP connection
+                    continue
+                with self._lock:
+                    self.batches += 1
+                for msg, future, queued_at in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    self._limiter.acquire()
+                    try:
+                        conn = self._send(conn, msg)
+                    except Exception as e:
+                        conn = self._close(conn)
+                        with self._lock:
+                            self.failed += 1
+                        print(f"❌ Error sending email: {e}")
+                        future.set_exception(e)
+                    else:
+                        with self._lock:
+                            self.sent += 1
+                            self._latencies.append((time.monotonic() - queued_at) * 1000)
+                        future.set_result(True)
+
+    def _send(self, conn, msg):
+        """Send over the worker's connection, reconnecting once if it dropped."""
+        for attempt in (1, 2):
+            if conn is None:
+                conn = mail.connect()
+                conn.__enter__()
+                with self._lock:
+                    self.connections_opened += 1
+            try:
+                conn.send(msg)
+                return conn
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                conn = self._close(conn)
+                if attempt == 2:
+                    raise
+        return conn
+
+    @staticmethod
+    def _close(conn) -> None:
+        if conn is not None:
+            try:
+                conn.__exit__(None, None, None)
+            except Exception:
+                pass
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'workers': len([t for t in self._threads if t.is_alive()]),
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'sent': self.sent,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'batches': self.batches,
+                'connections_opened': self.connections_opened,
+                'rate_limit_per_sec': self._limiter.rate,
+                'latency_ms_p50': round(latencies[len(latencies) // 2], 2) if latencies else None,
+                'latency_ms_p95': round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+            }
+
+
+# Global dispatcher; configured in create_app, workers start on first submit
+mail_dispatcher = MailDispatcher()
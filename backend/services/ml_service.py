@@ -1,37 +1,30 @@
-import pickle
-import numpy as np
 import os
 from typing import Dict, Any, Optional, Tuple
 
+from backend.services.feature_mapping import EXPECTED_FEATURES
+from backend.services.preprocessing import get_preprocessor
+from backend.services.model_registry import model_registry, RISK_MODEL
+
 class MLService:
     """Machine Learning service for risk prediction"""
     
     def __init__(self, model_path: str = None):
-        self.model = None
-        self.model_path = model_path or os.path.join('models', 'xgboost_risk_model.pkl')
-        self.load_model()
+        # Models are resolved through the shared registry; nothing is loaded here
+        self.model_path = model_path or os.path.join('models', RISK_MODEL)
+        self.model_name = os.path.basename(self.model_path)
+    
+    @property
+    def model(self):
+        """The trained XGBoost model, loaded once per process by the registry"""
+        return model_registry.get(self.model_name)
     
     def load_model(self):
-        """Load the trained XGBoost model"""
-        try:
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            print("✅ XGBoost model loaded successfully")
-        except Exception as e:
-            print(f"❌ Error loading model: {e}")
-            self.model = None
+        """Force the trained XGBoost model to be (re)loaded from disk"""
+        model_registry.reload(self.model_name)
     
     def validate_features(self, data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
         """Validate that all required features are present"""
-        required_features = [
-            'ID',
-            'KIDSDRIV', 'BIRTH', 'AGE', 'HOMEKIDS', 'YOJ', 'INCOME', 'PARENT1',
-            'HOME_VAL', 'MSTATUS', 'GENDER', 'EDUCATION', 'OCCUPATION', 'TRAVTIME',
-            'CAR_USE', 'BLUEBOOK', 'TIF', 'CAR_TYPE', 'RED_CAR', 'OLDCLAIM',
-            'CLM_FREQ', 'REVOKED', 'MVR_PTS', 'CLM_AMT', 'CAR_AGE', 'URBANICITY'
-        ]
-        
-        missing_features = [f for f in required_features if f not in data]
+        missing_features = [f for f in EXPECTED_FEATURES if f not in data]
         
         if missing_features:
             return False, f"Missing required fields: {', '.join(missing_features)}"
@@ -54,23 +47,15 @@ class MLService:
             return False, None, error_msg
         
         try:
-            # Extract features in the correct order
-            features = [
-                'ID',
-                'KIDSDRIV', 'BIRTH', 'AGE', 'HOMEKIDS', 'YOJ', 'INCOME', 'PARENT1',
-                'HOME_VAL', 'MSTATUS', 'GENDER', 'EDUCATION', 'OCCUPATION', 'TRAVTIME',
-                'CAR_USE', 'BLUEBOOK', 'TIF', 'CAR_TYPE', 'RED_CAR', 'OLDCLAIM',
-                'CLM_FREQ', 'REVOKED', 'MVR_PTS', 'CLM_AMT', 'CAR_AGE', 'URBANICITY'
-            ]
-            
-            feature_values = [data[feature] for feature in features]
-            
-            # Convert to numpy array and reshape for prediction
-            X = np.array(feature_values).reshape(1, -1)
+            # Extract and encode features in the correct order into a float32 matrix
+            preprocessor = get_preprocessor()
+            X, _, invalid = preprocessor.transform(data)
+            if invalid[0]:
+                return False, None, f"Invalid value for field(s): {', '.join(invalid[0])}"
             
             # Make prediction
             risk_prediction = self.model.predict(X)[0]
-            risk_score = int(risk_prediction)
+            risk_score = int(preprocessor.decode_target(int(risk_prediction)))
             
             return True, risk_score, None
             
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, Optional
+
+MODELS_DIR = 'models'
+
+# Artifact file names under MODELS_DIR
+RISK_MODEL = 'xgboost_risk_model.pkl'
+TARGET_ENCODER = 'target_encoder.pkl'
+
+
+def _estimate_footprint(obj: Any) -> int:
+    """Best-effort in-memory size of a loaded artifact, in bytes."""
+    try:
+        # XGBoost keeps the trees in native memory; the raw booster is the best proxy
+        if hasattr(obj, 'get_booster'):
+            return len(obj.get_booster().save_raw())
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def _unpickle(path: str) -> Any:
+    """Load a pickled artifact; falls back to joblib for files written with joblib.dump."""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except pickle.UnpicklingError:
+        import joblib
+        return joblib.load(path)
+
+
+class ModelRegistry:
+    """Process-wide registry that loads each artifact under models/ exactly once.
+
+    Artifacts are loaded lazily on first use. Loading is guarded by a lock so
+    concurrent requests in a threaded worker never unpickle the same file twice.
+    A failed load is remembered (like the old import-time loaders) until
+    `reload()` is called.
+    """
+
+    def __init__(self, models_dir: str | None = None):
+        self.models_dir = models_dir or MODELS_DIR
+        self._lock = threading.Lock()
+        self._artifacts: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.models_dir, name)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the loaded artifact (or None if it failed to load)."""
+        try:
+            return self._artifacts[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._artifacts:
+                self._artifacts[name] = self._load(name)
+            return self._artifacts[name]
+
+    def get_risk_model(self) -> Optional[Any]:
+        return self.get(RISK_MODEL)
+
+    def version(self, name: str) -> Optional[str]:
+        """Content hash of the loaded artifact; changes whenever the file is replaced and reloaded."""
+        self.get(name)
+        return (self._stats.get(name) or {}).get('version')
+
+    def reload(self, name: str) -> Optional[Any]:
+        """Drop a cached artifact and load it again from disk."""
+        with self._lock:
+            self._artifacts[name] = self._load(name)
+            return self._artifacts[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load time, footprint and version for every artifact loaded so far."""
+        return {name: dict(info) for name, info in self._stats.items()}
+
+    def _load(self, name: str) -> Optional[Any]:
+        path = self.path_for(name)
+        started = time.perf_counter()
+        try:
+            with open(path, 'rb') as f:
+                version = hashlib.sha256(f.read()).hexdigest()[:12]
+            obj = _unpickle(path)
+        except Exception as e:
+            print(f"❌ Error loading {name}: {e}")
+            self._stats[name] = {
+                'loaded': False,
+                'error': str(e),
+                'path': path,
+            }
+            return None
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self._stats[name] = {
+            'loaded': True,
+            'path': path,
+            'version': version,
+            'type': type(obj).__name__,
+            'load_time_ms': round(elapsed_ms, 2),
+            'file_bytes': os.path.getsize(path),
+            'memory_bytes': _estimate_footprint(obj),
+            'loaded_at': time.time(),
+        }
+        print(f"✅ {name} loaded successfully ({elapsed_ms:.1f} ms)")
+        return obj
+
+
+# Global registry instance shared by every blueprint and service
+model_registry = ModelRegistry()
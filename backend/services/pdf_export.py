@@ -0,0 +1,209 @@
+import multiprocessing
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from backend.services.pdf_renderer import PdfRenderer, QuotePdfTemplate, LABELS, quote_version, pdf_renderer
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The user fields the quote PDF shows; picklable for the render processes."""
+    name: str
+    email: str
+
+
+@dataclass(frozen=True)
+class QuoteSnapshot:
+    """The quote fields the quote PDF shows; picklable for the render processes."""
+    id: int
+    created_at: datetime
+    risk_level: str
+    quote_amount: int
+    credit_score: Optional[int]
+    driving_patterns: Optional[Dict[str, Any]]
+
+    @classmethod
+    def of(cls, quote) -> 'QuoteSnapshot':
+        return cls(quote.id, quote.created_at, quote.risk_level, quote.quote_amount,
+                   quote.credit_score, quote.driving_patterns)
+
+
+# Per-process templates, built on first use in each render worker
+_worker_templates: Dict[str, QuotePdfTemplate] = {}
+
+
+def _render_in_worker(language: str, user: UserSnapshot, quote: QuoteSnapshot) -> bytes:
+    template = _worker_templates.get(language)
+    if template is None:
+        template = _worker_templates[language] = QuotePdfTemplate.build(language)
+    return PdfRenderer.render_bytes(template, user, quote)
+
+
+class _ZipStream:
+    """Write-only sink for ZipFile; drain() hands back what has been written so far."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PdfExporter:
+    """
+    Bulk export of quote PDFs as a streamed ZIP.
+
+    PDFs already in the PDF cache are used as-is; the rest are rendered with
+    the same QuotePdfTemplate layout in a pool of `workers` processes and
+    stored in the cache. At most `workers * 2` renders are in flight, and each
+    archive entry is yielded as soon as it is written, so memory stays bounded
+    by the render window rather than the archive size. With `workers` <= 1 the
+    PDFs are rendered in-process. A quote whose PDF cannot be rendered gets a
+    short `..._ERROR.txt` entry instead, so the archive is always complete.
+    """
+
+    def __init__(self, renderer: PdfRenderer, workers: int = 1, max_quotes: int = 500):
+        self.renderer = renderer
+        self.workers = workers
+        self.max_quotes = max_quotes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.exports = 0
+        self.rendered = 0
+        self.cache_hits = 0
+        self.failed = 0
+
+    def configure(self, workers: Optional[int] = None, max_quotes: Optional[int] = None) -> None:
+        with self._lock:
+            if workers is not None:
+                self.workers = int(workers)
+            if max_quotes is not None:
+                self.max_quotes = int(max_quotes)
+            self._shutdown()
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn: the app process runs worker threads, which fork() would not copy safely
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _discard_pool(self, pool) -> None:
+        """Drop a broken pool so the next export starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._shutdown()
+
+    def entry_name(self, quote) -> str:
+        return f"insurance_quote_{quote.id}_{quote.created_at.strftime('%Y%m%d')}.pdf"
+
+    def _submit(self, pool, language: str, user: UserSnapshot, quote) -> Tuple[str, Any]:
+        """(cache key, cached bytes or Future of the render) for one quote."""
+        key = self.renderer.cache.key_for(quote.id, quote_version(user, quote), language)
+        cached = self.renderer.cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self.cache_hits += 1
+            return key, cached.data
+        snapshot = QuoteSnapshot.of(quote)
+        if pool is not None:
+            try:
+                return key, pool.submit(_render_in_worker, language, user, snapshot)
+            except BrokenExecutor as e:
+                future: Future = Future()
+                future.set_exception(e)
+                return key, future
+        future = Future()
+        try:
+            future.set_result(PdfRenderer.render_bytes(self.renderer.template(language), user, snapshot))
+        except Exception as e:
+            future.set_exception(e)
+        return key, future
+
+    def _rendered(self, key: str, data: bytes) -> None:
+        self.renderer.cache.put(key, data)
+        with self._lock:
+            self.rendered += 1
+
+    def stream_zip(self, user, quotes: List[Any], language: str = 'en') -> Iterator[bytes]:
+        """Yield a ZIP archive of the quotes' PDFs, entry by entry, in `quotes` order."""
+        language = language if language in LABELS else 'en'
+        snapshot = UserSnapshot(user.name, user.email)
+        pool = self._executor()
+        window = max(1, self.workers * 2)
+        pending: Deque[Tuple[Any, str, Any]] = deque()
+        sink = _ZipStream()
+        remaining = iter(quotes)
+
+        with self._lock:
+            self.exports += 1
+        try:
+            with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                while True:
+                    while len(pending) < window:
+                        quote = next(remaining, None)
+                        if quote is None:
+                            break
+                        pending.append((quote, *self._submit(pool, language, snapshot, quote)))
+                    if not pending:
+                        break
+                    quote, key, result = pending.popleft()
+                    if isinstance(result, Future):
+                        try:
+                            result = result.result()
+                        except Exception as e:
+                            # Headers are already sent; record the failure in the archive itself
+                            print(f"❌ PDF export failed for quote {quote.id}: {e!r}")
+                            if isinstance(e, BrokenExecutor):
+                                self._discard_pool(pool)
+                            with self._lock:
+                                self.failed += 1
+                            archive.writestr(f'insurance_quote_{quote.id}_ERROR.txt',
+                                             f'The PDF for quote {quote.id} could not be rendered: {e!r}\n')
+                            yield sink.drain()
+                            continue
+                        self._rendered(key, result)
+                    archive.writestr(self.entry_name(quote), result)
+                    yield sink.drain()
+            yield sink.drain()  # central directory
+        finally:
+            for _, _, result in pending:
+                if isinstance(result, Future):
+                    result.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_quotes': self.max_quotes,
+                'exports': self.exports,
+                'rendered': self.rendered,
+                'cache_hits': self.cache_hits,
+                'failed': self.failed,
+            }
+
+
+# Global exporter; pool size and export limit set from app config in create_app
+pdf_exporter = PdfExporter(pdf_renderer)
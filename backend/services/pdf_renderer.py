@@ -0,0 +1,441 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+# Bump when the layout changes so cached PDFs are re-rendered
+TEMPLATE_VERSION = 1
+
+LABELS: Dict[str, Dict[str, str]] = {
+    'sw': {
+        'title': "Nukuu ya Bima",
+        'company_name': "AutoUnderwriter",
+        'quote_details': "Maelezo ya Nukuu",
+        'customer_info': "Maelezo ya Mteja",
+        'risk_assessment': "Tathmini ya Hatari",
+        'premium_breakdown': "Mgawanyo wa Ada",
+        'generated_on': "Imetengenezwa tarehe",
+        'quote_id_label': "Nambari ya Nukuu",
+        'name_label': "Jina",
+        'email_label': "Barua pepe",
+        'risk_level_label': "Kiwango cha Hatari",
+        'quote_amount_label': "Kiasi cha Nukuu",
+        'valid_until': "Nukuu hii ni halali hadi",
+        'footer_text': "Asante kwa kutumia AutoUnderwriter",
+    },
+    'en': {
+        'title': "Insurance Quote",
+        'company_name': "AutoUnderwriter",
+        'quote_details': "Quote Details",
+        'customer_info': "Customer Information",
+        'risk_assessment': "Risk Assessment",
+        'premium_breakdown': "Premium Breakdown",
+        'generated_on': "Generated on",
+        'quote_id_label': "Quote ID",
+        'name_label': "Name",
+        'email_label': "Email",
+        'risk_level_label': "Risk Level",
+        'quote_amount_label': "Quote Amount",
+        'valid_until': "This quote is valid until",
+        'footer_text': "Thank you for choosing AutoUnderwriter",
+    },
+}
+
+_INFO_TABLE_COMMANDS = [
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e5e7eb'))
+]
+
+_RISK_COLORS = {'Medium': colors.orange, 'High': colors.red}
+
+
+def _risk_table_style(risk_color) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+        ('BACKGROUND', (1, 0), (1, 0), risk_color),
+        ('BACKGROUND', (1, 1), (1, 1), colors.HexColor('#dcfce7')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('FONTNAME', (1, 1), (1, 1), 'Helvetica-Bold'),
+        ('FONTSIZE', (1, 1), (1, 1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e5e7eb'))
+    ])
+
+
+@dataclass(frozen=True)
+class QuotePdfTemplate:
+    """Styles, table styles and labels for one language, built once and reused for every render."""
+    language: str
+    labels: Dict[str, str]
+    styles: StyleSheet1
+    title_style: ParagraphStyle
+    heading_style: ParagraphStyle
+    info_table_style: TableStyle
+    risk_table_styles: Dict[str, TableStyle]
+
+    @classmethod
+    def build(cls, language: str) -> 'QuotePdfTemplate':
+        styles = getSampleStyleSheet()
+        return cls(
+            language=language,
+            labels=LABELS.get(language, LABELS['en']),
+            styles=styles,
+            title_style=ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                spaceAfter=30,
+                alignment=TA_CENTER,
+                textColor=colors.HexColor('#2563eb')
+            ),
+            heading_style=ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=16,
+                spaceAfter=12,
+                textColor=colors.HexColor('#1f2937')
+            ),
+            info_table_style=TableStyle(_INFO_TABLE_COMMANDS),
+            risk_table_styles={
+                level: _risk_table_style(_RISK_COLORS.get(level, colors.green))
+                for level in ('Low', 'Medium', 'High')
+            },
+        )
+
+    def _info_table(self, rows: List[List[str]]) -> Table:
+        table = Table(rows, colWidths=[2*inch, 3*inch])
+        table.setStyle(self.info_table_style)
+        return table
+
+    def story(self, user, quote) -> list:
+        """Flowables for one quote document."""
+        labels = self.labels
+        story = []
+
+        # Header
+        story.append(Paragraph(labels['title'], self.title_style))
+        story.append(Paragraph(labels['company_name'], self.styles['Heading2']))
+        story.append(Spacer(1, 20))
+
+        # Quote information table
+        valid_until_dt = quote.created_at + timedelta(days=30)
+        story.append(self._info_table([
+            [labels['quote_id_label'], str(quote.id)],
+            [labels['generated_on'], quote.created_at.strftime('%B %d, %Y at %I:%M %p')],
+            [labels['valid_until'], valid_until_dt.strftime('%B %d, %Y')]
+        ]))
+        story.append(Spacer(1, 20))
+
+        # Customer Information
+        story.append(Paragraph(labels['customer_info'], self.heading_style))
+        story.append(self._info_table([
+            [labels['name_label'], user.name],
+            [labels['email_label'], user.email]
+        ]))
+        story.append(Spacer(1, 20))
+
+        # Risk Assessment
+        story.append(Paragraph(labels['risk_assessment'], self.heading_style))
+        risk_table = Table([
+            [labels['risk_level_label'], quote.risk_level],
+            [labels['quote_amount_label'], f"KES {quote.quote_amount:,}"]
+        ], colWidths=[2*inch, 3*inch])
+        risk_table.setStyle(self.risk_table_styles.get(quote.risk_level, self.risk_table_styles['Low']))
+        story.append(risk_table)
+        story.append(Spacer(1, 30))
+
+        # Additional information if available
+        if quote.credit_score or quote.driving_patterns:
+            story.append(Paragraph("Additional Risk Factors", self.heading_style))
+            additional_data = []
+
+            if quote.credit_score:
+                additional_data.append(["Credit Score", str(quote.credit_score)])
+
+            if quote.driving_patterns:
+                patterns = quote.driving_patterns
+                if patterns.get('speeding_incidents'):
+                    additional_data.append(["Speeding Incidents", str(patterns['speeding_incidents'])])
+                if patterns.get('harsh_braking_freq'):
+                    additional_data.append(["Harsh Braking Events", str(patterns['harsh_braking_freq'])])
+                if patterns.get('aggressive_acceleration'):
+                    additional_data.append(["Aggressive Acceleration", str(patterns['aggressive_acceleration'])])
+
+            if additional_data:
+                story.append(self._info_table(additional_data))
+                story.append(Spacer(1, 30))
+
+        # Footer
+        story.append(Spacer(1, 40))
+        story.append(Paragraph(labels['footer_text'], self.styles['Normal']))
+        return story
+
+    def build_pdf(self, target, user, quote) -> None:
+        """Lay out the quote into `target` (a path or binary file object)."""
+        doc = SimpleDocTemplate(
+            target,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
+        doc.build(self.story(user, quote))
+
+
+def quote_version(user, quote) -> str:
+    """Fingerprint of every quote/user field that appears in the PDF."""
+    fields = [
+        TEMPLATE_VERSION,
+        quote.id,
+        quote.created_at.isoformat() if quote.created_at else None,
+        quote.risk_level,
+        quote.quote_amount,
+        quote.credit_score,
+        quote.driving_patterns,
+        user.name,
+        user.email,
+    ]
+    raw = json.dumps(fields, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class RenderedPdf:
+    """A rendered quote PDF. `path` is set only when the cache persisted it to disk."""
+    key: str
+    data: bytes
+    path: Optional[str] = None
+
+
+class PdfCache:
+    """
+    Two-tier cache of rendered PDFs, keyed by quote id, quote version and
+    language (content-addressed, so a key never goes stale).
+
+    Recent PDFs are kept as bytes in a small in-memory LRU. With
+    `persist` on, they are also written to `directory`. Disk reads refresh
+    a file's mtime, and when the directory grows past `max_bytes` the least
+    recently used files are deleted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 200 * 1024 * 1024,
+                 memory_max_bytes: int = 32 * 1024 * 1024, persist: bool = True):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'underwriter_pdf_cache')
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        self._total_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                  memory_max_bytes: Optional[int] = None, persist: Optional[bool] = None) -> None:
+        with self._lock:
+            if directory:
+                self.directory = directory
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+            if memory_max_bytes is not None:
+                self.memory_max_bytes = int(memory_max_bytes)
+            if persist is not None:
+                self.persist = bool(persist)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._total_bytes = None
+
+    @staticmethod
+    def key_for(quote_id: int, version: str, language: str) -> str:
+        return f'quote_{quote_id}_{language}_{version}.pdf'
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[RenderedPdf]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+        if data is not None:
+            return RenderedPdf(key, data, self._persisted_path(key))
+        if self.persist:
+            path = self.path_for(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)  # mark as recently used
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, data)
+                return RenderedPdf(key, data, path)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> RenderedPdf:
+        """Cache freshly rendered bytes; written to disk only when `persist` is on."""
+        self._remember(key, data)
+        path = self.write(key, data) if self.persist else None
+        return RenderedPdf(key, data, path)
+
+    def write(self, key: str, data: bytes) -> str:
+        """Persist bytes under `key` (temp file + atomic rename) and return the path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._account(len(data) - replaced)
+        return path
+
+    def _persisted_path(self, key: str) -> Optional[str]:
+        if not self.persist:
+            return None
+        path = self.path_for(key)
+        return path if os.path.exists(path) else None
+
+    def _remember(self, key: str, data: bytes) -> None:
+        if len(data) > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _account(self, added: int) -> None:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            else:
+                self._total_bytes += added
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith('.pdf'):
+                        st = entry.stat()
+                        entries.append((entry.path, st.st_size, st.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the cache is back under 90% of max_bytes."""
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'directory': self.directory if self.persist else None,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class PdfRenderer:
+    """Renders quote PDFs in memory through per-language templates and the PDF cache."""
+
+    def __init__(self, cache: PdfCache):
+        self.cache = cache
+        self._templates: Dict[str, QuotePdfTemplate] = {}
+        self._lock = threading.Lock()
+
+    def template(self, language: str) -> QuotePdfTemplate:
+        language = language if language in LABELS else 'en'
+        template = self._templates.get(language)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(language)
+                if template is None:
+                    template = QuotePdfTemplate.build(language)
+                    self._templates[language] = template
+        return template
+
+    def render(self, user, quote, language: str = 'en') -> RenderedPdf:
+        """The PDF for this quote version, from cache or rendered into a BytesIO."""
+        template = self.template(language)
+        key = self.cache.key_for(quote.id, quote_version(user, quote), template.language)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        return self.cache.put(key, self.render_bytes(template, user, quote))
+
+    @staticmethod
+    def render_bytes(template: QuotePdfTemplate, user, quote) -> bytes:
+        """Lay out one quote into a BytesIO and return the PDF bytes (no caching)."""
+        buffer = io.BytesIO()
+        template.build_pdf(buffer, user, quote)
+        return buffer.getvalue()
+
+    def render_to_path(self, user, quote, language: str = 'en') -> str:
+        """Like render(), but always backed by a file on disk (for callers that need a path)."""
+        rendered = self.render(user, quote, language)
+        return rendered.path or self.cache.write(rendered.key, rendered.data)
+
+
+# Global renderer; cache directory and size set from app config in create_app
+pdf_cache = PdfCache()
+pdf_renderer = PdfRenderer(pdf_cache)
@@ -0,0 +1,95 @@
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.services.feature_mapping import FEATURE_SCHEMA, FEATURE_DTYPE, FeatureSchema
+from backend.services.model_registry import model_registry, TARGET_ENCODER
+
+# Category levels of the string columns in the training data, in the order
+# sklearn's LabelEncoder assigned codes (sorted). Only the target encoder was
+# persisted by the training notebook, so these reproduce the per-column
+# encoders it fitted. Clients that already send integer codes are unaffected.
+CATEGORICAL_LEVELS: Dict[str, Tuple[str, ...]] = {
+    'PARENT1': ('No', 'Yes'),
+    'MSTATUS': ('Yes', 'z_No'),
+    'GENDER': ('M', 'z_F'),
+    'EDUCATION': ('<High School', 'Bachelors', 'Masters', 'PhD', 'z_High School'),
+    'OCCUPATION': ('Clerical', 'Doctor', 'Home Maker', 'Lawyer', 'Manager',
+                   'Professional', 'Student', 'z_Blue Collar'),
+    'CAR_USE': ('Commercial', 'Private'),
+    'CAR_TYPE': ('Minivan', 'Panel Truck', 'Pickup', 'Sports Car', 'Van', 'z_SUV'),
+    'RED_CAR': ('no', 'yes'),
+    'REVOKED': ('No', 'Yes'),
+    'URBANICITY': ('Highly Urban/ Urban', 'z_Highly Rural/ Rural'),
+}
+
+# Friendly spellings accepted from the chatbot and forms
+CATEGORICAL_ALIASES: Dict[str, Dict[str, str]] = {
+    'MSTATUS': {'married': 'Yes', 'single': 'z_No'},
+    'GENDER': {'male': 'M', 'female': 'z_F', 'f': 'z_F'},
+    'URBANICITY': {'urban': 'Highly Urban/ Urban', 'rural': 'z_Highly Rural/ Rural'},
+}
+
+
+def _normalize(label: str) -> str:
+    label = label.strip().lower()
+    return label[2:] if label.startswith('z_') else label
+
+
+class Preprocessor:
+    """
+    Fast preprocessing stage in front of the risk model.
+    Categorical lookups are plain dicts compiled once; each batch is encoded
+    column by column, resolving every distinct string once with np.unique.
+    The target encoder's classes_ become an array used to decode predictions.
+    """
+
+    def __init__(self, schema: FeatureSchema, target_classes: Optional[Sequence[Any]] = None):
+        self.schema = schema
+        self.tables: Dict[str, Dict[str, int]] = {}
+        for name, levels in CATEGORICAL_LEVELS.items():
+            table = {_normalize(level): code for code, level in enumerate(levels)}
+            for alias, level in CATEGORICAL_ALIASES.get(name, {}).items():
+                table[alias] = levels.index(level)
+            self.tables[name] = table
+        self.target_classes = np.asarray(target_classes) if target_classes is not None else None
+
+    def encode_column(self, name: str, values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Encode raw strings for one column. Returns (codes, ok_mask)."""
+        table = self.tables.get(name)
+        n = len(values)
+        if table is None:
+            return np.zeros(n, dtype=FEATURE_DTYPE), np.zeros(n, dtype=bool)
+        uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+        unique_codes = np.array([table.get(_normalize(u), -1) for u in uniques], dtype=np.int64)
+        codes = unique_codes[inverse]
+        ok = codes >= 0
+        return codes.astype(FEATURE_DTYPE), ok
+
+    def transform(self, payloads: Union[Mapping[str, Any], Sequence[Mapping[str, Any]]]
+                  ) -> Tuple[np.ndarray, List[List[str]], List[List[str]]]:
+        """Same contract as FeatureSchema.build_matrix, with categoricals encoded."""
+        return self.schema.build_matrix(payloads, encode=self.encode_column)
+
+    def decode_target(self, class_index: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+        """Map model class indices back to the original target labels."""
+        if self.target_classes is None:
+            return class_index
+        return self.target_classes[class_index]
+
+
+_lock = threading.Lock()
+_preprocessor: Optional[Preprocessor] = None
+
+
+def get_preprocessor() -> Preprocessor:
+    """Return the process-wide preprocessor, building it on first use."""
+    global _preprocessor
+    if _preprocessor is None:
+        with _lock:
+            if _preprocessor is None:
+                encoder = model_registry.get(TARGET_ENCODER)
+                classes = getattr(encoder, 'classes_', None)
+                _preprocessor = Preprocessor(FEATURE_SCHEMA, classes)
+    return _preprocessor
@@ -1,83 +1,187 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-BASE_PREMIUM = 8000  # KES
+import numpy as np
 
+from backend.services.rating_tables import RatingTables, get_rating_tables
 
-def _risk_multiplier(risk_score: int) -> float:
-    if risk_score == 0:
-        return 0.8
-    if risk_score == 1:
-        return 1.2
-    return 1.8
+# Rating cut-offs, loadings and the base premium live in the `rating` section
+# of the motor reference data (see rating_tables.py); nothing is hard-coded here.
 
 
-def _age_factor(age: int) -> float:
-    if age < 25:
-        return 1.3
-    if age > 50:
-        return 0.9
-    return 1.0
+def _risk_multiplier(risk_score: int, tables: RatingTables) -> float:
+    return tables.risk_multiplier.lookup(risk_score)
 
 
-def _car_value_factor(bluebook: float) -> float:
-    if bluebook > 15000:
-        return 1.2
-    if bluebook < 5000:
-        return 0.9
-    return 1.0
+def _age_factor(age: int, tables: RatingTables) -> float:
+    return tables.age_factor.lookup(age)
 
 
-def _claims_factor(clm_freq: int) -> float:
-    return 1.0 + (clm_freq * 0.2)
+def _car_value_factor(bluebook: float, tables: RatingTables) -> float:
+    return tables.car_value_factor.lookup(bluebook)
 
 
-def _credit_factor(credit_score: int | None) -> float:
+def _claims_factor(clm_freq: int, tables: RatingTables) -> float:
+    return 1.0 + (clm_freq * tables.claims_per_unit)
+
+
+def _credit_factor(credit_score: int | None, tables: RatingTables) -> float:
     if credit_score is None:
-        return 1.0
-    if credit_score >= 750:
-        return 0.9
-    if credit_score >= 650:
-        return 1.0
-    if credit_score >= 550:
-        return 1.1
-    return 1.3
+        return tables.credit_missing_value
+    return tables.credit_factor.lookup(credit_score)
 
 
-def _driving_factor(driving_patterns: Dict[str, Any] | None) -> float:
+def _driving_factor(driving_patterns: Dict[str, Any] | None, tables: RatingTables) -> float:
     if not driving_patterns:
         return 1.0
-    speeding = float(driving_patterns.get('speeding_incidents', 0)) * 0.05
-    braking = float(driving_patterns.get('harsh_braking_freq', 0)) * 0.03
-    accel = float(driving_patterns.get('aggressive_acceleration', 0)) * 0.02
-    return min(1.0 + speeding + braking + accel, 1.5)
+    factor = 1.0
+    for key, weight in tables.driving_weights:
+        factor = factor + float(driving_patterns.get(key, 0)) * weight
+    return min(factor, tables.driving_cap)
+
+
+def _add_on_factor(add_ons: Any, tables: RatingTables) -> float:
+    return 1.0 + tables.addon_loading_pct(add_ons) / 100.0
 
 
 def calculate_premium(risk_score: int, user_data: Dict[str, Any],
                       credit_score: int | None = None,
-                      driving_patterns: Dict[str, Any] | None = None) -> Dict[str, Any]:
+                      driving_patterns: Dict[str, Any] | None = None,
+                      add_ons: Any = None) -> Dict[str, Any]:
     """
     Returns a breakdown and total premium.
+    `add_ons` (list of keys or object of flags) applies percent-of-premium loadings.
     """
+    tables = get_rating_tables()
     age = int(user_data.get('AGE', 25))
     bluebook = float(user_data.get('BLUEBOOK', 7000))
     clm_freq = int(user_data.get('CLM_FREQ', 0))
 
     parts = {
-        'base': BASE_PREMIUM,
-        'risk_multiplier': _risk_multiplier(risk_score),
-        'age_factor': _age_factor(age),
-        'car_value_factor': _car_value_factor(bluebook),
-        'claims_factor': _claims_factor(clm_freq),
-        'credit_factor': _credit_factor(credit_score),
-        'driving_factor': _driving_factor(driving_patterns),
+        'base': tables.base_premium,
+        'risk_multiplier': _risk_multiplier(risk_score, tables),
+        'age_factor': _age_factor(age, tables),
+        'car_value_factor': _car_value_factor(bluebook, tables),
+        'claims_factor': _claims_factor(clm_freq, tables),
+        'credit_factor': _credit_factor(credit_score, tables),
+        'driving_factor': _driving_factor(driving_patterns, tables),
+        'add_on_factor': _add_on_factor(add_ons, tables),
     }
 
     total = int(parts['base'] * parts['risk_multiplier'] * parts['age_factor'] *
                 parts['car_value_factor'] * parts['claims_factor'] *
-                parts['credit_factor'] * parts['driving_factor'])
-    total = max(total, 5000)
+                parts['credit_factor'] * parts['driving_factor'] *
+                parts['add_on_factor'])
+    total = max(total, tables.minimum_premium)
 
     return {
         'breakdown': parts,
         'total': total
     }
+
+
+# ---------------------------------------------------------------------------
+# Vectorized pricing for whole portfolios (renewal re-rating, batch quotes).
+# Every factor mirrors the scalar helpers above and the product is taken in
+# the same order, so totals match calculate_premium to the shilling.
+# ---------------------------------------------------------------------------
+
+def _column(values, n: int, default: float) -> np.ndarray:
+    if values is None:
+        return np.full(n, default, dtype=np.float64)
+    arr = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(arr), default, arr) if arr.ndim else np.full(n, float(arr))
+
+
+def calculate_premiums(risk_scores, ages=None, bluebooks=None, claim_freqs=None,
+                       credit_scores=None, speeding_incidents=None,
+                       harsh_braking_freq=None, aggressive_acceleration=None,
+                       add_on_pcts=None) -> Dict[str, Any]:
+    """
+    Price many policies in one pass from columnar inputs.
+    All arguments are array-likes of equal length (or None for the scalar
+    defaults); NaN in credit_scores means "no credit score". add_on_pcts is
+    the total percent-of-premium add-on loading per row.
+    Returns {'total': int64 array, 'breakdown': {factor_name: array}}.
+    """
+    tables = get_rating_tables()
+    risk = np.asarray(risk_scores, dtype=np.int64)
+    n = risk.shape[0]
+
+    age = np.trunc(_column(ages, n, 25))
+    bluebook = _column(bluebooks, n, 7000)
+    clm_freq = np.trunc(_column(claim_freqs, n, 0))
+    credit = np.full(n, np.nan) if credit_scores is None else np.asarray(credit_scores, dtype=np.float64)
+
+    risk_multiplier = tables.risk_multiplier.lookup_many(risk)
+    age_factor = tables.age_factor.lookup_many(age)
+    car_value_factor = tables.car_value_factor.lookup_many(bluebook)
+    claims_factor = 1.0 + (clm_freq * tables.claims_per_unit)
+    credit_factor = np.where(np.isnan(credit), tables.credit_missing_value,
+                             tables.credit_factor.lookup_many(credit))
+    telematics = {
+        'speeding_incidents': speeding_incidents,
+        'harsh_braking_freq': harsh_braking_freq,
+        'aggressive_acceleration': aggressive_acceleration,
+    }
+    driving_factor = np.ones(n)
+    for key, weight in tables.driving_weights:
+        driving_factor = driving_factor + _column(telematics.get(key), n, 0) * weight
+    driving_factor = np.minimum(driving_factor, tables.driving_cap)
+    add_on_factor = 1.0 + _column(add_on_pcts, n, 0) / 100.0
+
+    base = np.full(n, tables.base_premium, dtype=np.int64)
+    total = (base * risk_multiplier * age_factor * car_value_factor * claims_factor *
+             credit_factor * driving_factor * add_on_factor)
+    total = np.maximum(np.trunc(total).astype(np.int64), tables.minimum_premium)
+
+    return {
+        'breakdown': {
+            'base': base,
+            'risk_multiplier': risk_multiplier,
+            'age_factor': age_factor,
+            'car_value_factor': car_value_factor,
+            'claims_factor': claims_factor,
+            'credit_factor': credit_factor,
+            'driving_factor': driving_factor,
+            'add_on_factor': add_on_factor,
+        },
+        'total': total
+    }
+
+
+def premium_columns(payloads: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Extract calculate_premiums inputs from quote payloads, using the same
+    fields and defaults as the scalar calculate_premium call in /predict.
+    """
+    tables = get_rating_tables()
+
+    def col(getter):
+        return np.array([getter(p) for p in payloads], dtype=np.float64)
+
+    def patterns(p):
+        return p.get('driving_patterns') or {}
+
+    def credit(p):
+        value = p.get('credit_score')
+        return np.nan if value is None else value
+
+    return {
+        'ages': col(lambda p: p.get('AGE', 25)),
+        'bluebooks': col(lambda p: p.get('BLUEBOOK', 7000)),
+        'claim_freqs': col(lambda p: p.get('CLM_FREQ', 0)),
+        'credit_scores': col(credit),
+        'speeding_incidents': col(lambda p: patterns(p).get('speeding_incidents', 0)),
+        'harsh_braking_freq': col(lambda p: patterns(p).get('harsh_braking_freq', 0)),
+        'aggressive_acceleration': col(lambda p: patterns(p).get('aggressive_acceleration', 0)),
+        'add_on_pcts': col(lambda p: tables.addon_loading_pct(p.get('add_ons'))),
+    }
+
+
+def premium_at(premiums: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """Row i of a calculate_premiums result, shaped like calculate_premium's output."""
+    breakdown = {name: values[i].item() for name, values in premiums['breakdown'].items()}
+    return {
+        'breakdown': breakdown,
+        'total': int(premiums['total'][i])
+    }
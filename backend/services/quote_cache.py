@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class SQLiteCacheBackend:
+    """
+    Optional shared second-level cache: a small SQLite file that every
+    worker process on the host can read and write. Expired rows are
+    deleted when read, and swept from the whole table at most once every
+    `purge_interval` seconds on write.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 300.0):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS quote_cache ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            'SELECT value, expires_at FROM quote_cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            conn = self._conn()
+            conn.execute('DELETE FROM quote_cache WHERE key = ? AND expires_at = ?', (key, row[1]))
+            conn.commit()
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO quote_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), now + ttl),
+        )
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            conn.execute('DELETE FROM quote_cache WHERE expires_at < ?', (now,))
+        conn.commit()
+
+
+class QuoteCache:
+    """
+    In-process LRU + TTL cache of model outputs (risk score, confidence).
+    Keys are a hash of the encoded feature row and the model version, so
+    payloads that only differ in add-ons, cover or contact fields hit the
+    same entry; pricing and validation are always recomputed by the caller.
+    """
+
+    def __init__(self, max_size: int = 2048, ttl: float = 600.0, shared: Optional[SQLiteCacheBackend] = None):
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+
+    def configure(self, max_size: int | None = None, ttl: float | None = None,
+                  shared_path: str | None = None) -> None:
+        with self._lock:
+            if max_size is not None:
+                self.max_size = int(max_size)
+            if ttl is not None:
+                self.ttl = float(ttl)
+            if shared_path:
+                self.shared = SQLiteCacheBackend(shared_path)
+            self._entries.clear()
+
+    @staticmethod
+    def key_for(features: np.ndarray, model_version: str | None) -> str:
+        """Canonical key: the float32 feature row bytes plus the model version."""
+        row = np.ascontiguousarray(features, dtype=np.float32)
+        digest = hashlib.blake2b(row.tobytes(), digest_size=16)
+        digest.update((model_version or '').encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.max_size <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except sqlite3.Error:
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                self._store(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        self._store(key, value)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, self.ttl)
+            except sqlite3.Error:
+                pass
+
+    def _store(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'shared_backend': self.shared is not None,
+                'shared_hits': self.shared_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Global cache instance; sized from app config in create_app
+quote_cache = QuoteCache()
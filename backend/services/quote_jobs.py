@@ -0,0 +1,158 @@
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app import db
+from backend.models.quote import Quote
+from backend.models.user import User
+from backend.services.job_queue import job_queue, QueueFull, RetryJob, ACTIVE_STATES, FAILED
+from backend.services.mail_dispatcher import mail_dispatcher, MailQueueFull
+from backend.services.event_bus import event_bus, user_topic
+
+# Job kinds
+PDF_JOB = 'quote_pdf'
+EMAIL_JOB = 'quote_email'
+JOB_LABELS = {PDF_JOB: 'pdf', EMAIL_JOB: 'email'}
+
+# Seconds to wait before retrying when the mail queue is full / for an SMTP result
+MAIL_BACKPRESSURE_DELAY = 5.0
+MAIL_SEND_TIMEOUT = 120.0
+
+
+def job_key(kind: str, quote_id: int) -> str:
+    """Dedupe key: one active job of each kind per quote."""
+    return f'{kind}:{quote_id}'
+
+
+def _load(payload: Dict[str, Any]) -> Tuple[Optional[Quote], Optional[User]]:
+    quote = Quote.query.get(payload['quote_id'])
+    if quote is None:
+        return None, None
+    return quote, User.query.get(quote.user_id)
+
+
+def ensure_quote_pdf(user, quote):
+    """Render (or fetch from the PDF cache) the quote's PDF and record it on the quote."""
+    from backend.routes.pdf import render_quote_pdf
+
+    rendered = render_quote_pdf(user, quote, user.language_preference)
+    if not rendered:
+        raise RuntimeError(f'PDF rendering failed for quote {quote.id}')
+    pdf_path = rendered.path or quote.pdf_path
+    if quote.pdf_path != pdf_path or not quote.pdf_generated:
+        quote.pdf_generated = True
+        quote.pdf_path = pdf_path
+        db.session.commit()
+    return rendered
+
+
+def run_pdf_job(payload: Dict[str, Any]) -> None:
+    quote, user = _load(payload)
+    if quote is None or user is None:
+        return  # quote deleted since it was queued
+    ensure_quote_pdf(user, quote)
+
+
+def run_email_job(payload: Dict[str, Any]) -> None:
+    from backend.routes.email import build_quote_email
+
+    quote, user = _load(payload)
+    if quote is None or user is None or quote.email_sent:
+        return
+    attachment = ensure_quote_pdf(user, quote).data if payload.get('attach_pdf') else None
+    msg = build_quote_email(user, quote, user.language_preference, attachment=attachment)
+    try:
+        future = mail_dispatcher.submit(msg)
+    except MailQueueFull as e:
+        raise RetryJob(str(e), delay=MAIL_BACKPRESSURE_DELAY)
+    # Wait for the SMTP result so failures surface here and the job is retried
+    try:
+        future.result(timeout=MAIL_SEND_TIMEOUT)
+    except FutureTimeout:
+        if future.cancel():
+            # Still queued: the sender drops cancelled messages, so a retry cannot send it twice
+            raise RetryJob(f'Quote {quote.id} email not sent within {MAIL_SEND_TIMEOUT:.0f}s',
+                           delay=MAIL_BACKPRESSURE_DELAY)
+        # Already handed to the SMTP sender: record it as sent rather than risk a duplicate
+        quote_id = quote.id
+        print(f"❌ Quote {quote_id} email still sending after {MAIL_SEND_TIMEOUT:.0f}s; not retrying")
+
+        def log_late_failure(f):
+            if f.exception() is not None:
+                print(f"❌ Quote {quote_id} email failed after its job gave up waiting: {f.exception()}")
+
+        future.add_done_callback(log_late_failure)
+    quote.email_sent = True
+    db.session.commit()
+
+
+def publish_job_event(job: Dict[str, Any], status: str, error: Optional[str]) -> None:
+    """Push PDF/email job completion to the quote owner's event stream."""
+    label = JOB_LABELS.get(job['kind'])
+    user_id = job['payload'].get('user_id')
+    if label is None or user_id is None:
+        return
+    event_bus.publish(user_topic(user_id), 'job', {
+        'quote_id': job['payload'].get('quote_id'),
+        'job': label,
+        'status': status,
+        'error': error,
+    })
+
+
+job_queue.register(PDF_JOB, run_pdf_job)
+job_queue.register(EMAIL_JOB, run_email_job)
+job_queue.add_listener(publish_job_event)
+
+
+def enqueue_quote_jobs(quote_id: int, attach_pdf: bool, email_send: bool,
+                       user_id: Optional[int] = None) -> Dict[str, str]:
+    """
+    Queue PDF rendering and/or the quote email for a saved quote.
+    Returns {'pdf': status, 'email': status} for the jobs requested; a
+    status of 'rejected' means the queue was full and nothing was queued.
+    With `user_id`, job completion is published to that user's event stream.
+    """
+    requested = []
+    if attach_pdf:
+        requested.append((PDF_JOB, {'quote_id': quote_id, 'user_id': user_id}))
+    if email_send:
+        requested.append((EMAIL_JOB, {'quote_id': quote_id, 'attach_pdf': attach_pdf, 'user_id': user_id}))
+
+    statuses = {}
+    for kind, payload in requested:
+        try:
+            job = job_queue.enqueue(kind, payload, dedupe_key=job_key(kind, quote_id))
+            statuses[JOB_LABELS[kind]] = job['status']
+        except QueueFull as e:
+            print(f"❌ {e}; {kind} for quote {quote_id} not queued")
+            statuses[JOB_LABELS[kind]] = 'rejected'
+    return statuses
+
+
+def quote_job_status(quote: Quote) -> Dict[str, Any]:
+    """Side-effect status for a quote, for clients polling after /api/predict."""
+    jobs = job_queue.latest_for_keys([job_key(kind, quote.id) for kind in JOB_LABELS])
+    job_info = {}
+    for kind, label in JOB_LABELS.items():
+        job = jobs.get(job_key(kind, quote.id))
+        if job is not None:
+            job_info[label] = {
+                'status': job['status'],
+                'attempts': job['attempts'],
+                'last_error': job['last_error'],
+            }
+
+    states = [info['status'] for info in job_info.values()]
+    if any(state in ACTIVE_STATES for state in states):
+        overall = 'pending'
+    elif FAILED in states:
+        overall = 'failed'
+    else:
+        overall = 'completed'
+    return {
+        'quote_id': quote.id,
+        'status': overall,
+        'pdf_generated': bool(quote.pdf_generated),
+        'email_sent': bool(quote.email_sent),
+        'jobs': job_info,
+    }
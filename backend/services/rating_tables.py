@@ -0,0 +1,129 @@
+import math
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.reference.loader import get_motor_reference
+
+
+@dataclass(frozen=True)
+class BandTable:
+    """
+    Step function compiled from reference bands.
+    breakpoints[i] is the lowest input that falls into band i + 1, so a
+    lookup is a single bisect_right (scalar) or searchsorted (arrays).
+    """
+    breakpoints: Tuple[float, ...]
+    values: Tuple[float, ...]
+    breakpoints_arr: np.ndarray
+    values_arr: np.ndarray
+
+    @classmethod
+    def from_bands(cls, bands: List[Dict[str, Any]]) -> 'BandTable':
+        """
+        `bands` is ordered low to high. The first band has no lower bound;
+        every following band starts either `from` a value (inclusive) or
+        `above` it (exclusive).
+        """
+        if not bands:
+            raise ValueError('rating band table must have at least one band')
+        breakpoints: List[float] = []
+        values: List[float] = [float(bands[0]['value'])]
+        for band in bands[1:]:
+            if 'from' in band:
+                edge = float(band['from'])
+            elif 'above' in band:
+                # x > a  <=>  x >= next float after a
+                edge = math.nextafter(float(band['above']), math.inf)
+            else:
+                raise ValueError(f"rating band needs 'from' or 'above': {band}")
+            if breakpoints and edge <= breakpoints[-1]:
+                raise ValueError('rating bands must be in ascending order')
+            breakpoints.append(edge)
+            values.append(float(band['value']))
+        return cls(
+            breakpoints=tuple(breakpoints),
+            values=tuple(values),
+            breakpoints_arr=np.asarray(breakpoints, dtype=np.float64),
+            values_arr=np.asarray(values, dtype=np.float64),
+        )
+
+    def lookup(self, x: float) -> float:
+        return self.values[bisect_right(self.breakpoints, x)]
+
+    def lookup_many(self, x: np.ndarray) -> np.ndarray:
+        return self.values_arr[np.searchsorted(self.breakpoints_arr, x, side='right')]
+
+
+@dataclass(frozen=True)
+class RatingTables:
+    """All pricing parameters compiled from the `rating` reference section."""
+    base_premium: int
+    minimum_premium: int
+    risk_multiplier: BandTable
+    age_factor: BandTable
+    car_value_factor: BandTable
+    credit_factor: BandTable
+    credit_missing_value: float
+    claims_per_unit: float
+    driving_weights: Tuple[Tuple[str, float], ...]
+    driving_cap: float
+    # add-on key -> percent of premium
+    addon_premium_pct: Dict[str, float]
+
+    @classmethod
+    def from_reference(cls, ref: Dict[str, Any]) -> 'RatingTables':
+        rating = ref['rating']
+        bands = rating['bands']
+        driving = rating.get('driving_factor', {})
+        addon_pct = {}
+        for key, cfg in (ref.get('addons') or {}).items():
+            impact = cfg.get('rating_impact') or {}
+            if impact.get('type') == 'percent_of_premium':
+                addon_pct[key] = float(impact.get('value_pct', 0))
+        return cls(
+            base_premium=int(rating['base_premium']),
+            minimum_premium=int(rating['minimum_premium']),
+            risk_multiplier=BandTable.from_bands(bands['risk_multiplier']),
+            age_factor=BandTable.from_bands(bands['age_factor']),
+            car_value_factor=BandTable.from_bands(bands['car_value_factor']),
+            credit_factor=BandTable.from_bands(bands['credit_factor']),
+            credit_missing_value=float(rating.get('credit_missing_factor', 1.0)),
+            claims_per_unit=float(rating['claims_factor_per_claim']),
+            driving_weights=tuple((k, float(v)) for k, v in (driving.get('weights') or {}).items()),
+            driving_cap=float(driving.get('cap', math.inf)),
+            addon_premium_pct=addon_pct,
+        )
+
+    def addon_loading_pct(self, add_ons: Any) -> float:
+        """Total percent-of-premium loading for the selected add-ons."""
+        return sum(self.addon_premium_pct.get(key, 0.0) for key in selected_add_ons(add_ons))
+
+
+def selected_add_ons(add_ons: Any) -> List[str]:
+    """Normalize add_ons (list of keys or object of flags) to a list of keys."""
+    if isinstance(add_ons, dict):
+        return [k for k, v in add_ons.items() if v]
+    if isinstance(add_ons, list):
+        return list(add_ons)
+    return []
+
+
+_lock = threading.Lock()
+_compiled: Optional[Tuple[Dict[str, Any], RatingTables]] = None
+
+
+def get_rating_tables() -> RatingTables:
+    """Rating tables for the current reference data, recompiled only when it changes."""
+    global _compiled
+    ref = get_motor_reference()
+    compiled = _compiled
+    if compiled is not None and compiled[0] is ref:
+        return compiled[1]
+    with _lock:
+        if _compiled is None or _compiled[0] is not ref:
+            _compiled = (ref, RatingTables.from_reference(ref))
+        return _compiled[1]
@@ -1,14 +1,108 @@
+import hashlib
 import json
 import os
-from functools import lru_cache
-from typing import Any, Dict
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
 BASE_DIR = os.path.dirname(__file__)
 REF_FILE = os.path.join(BASE_DIR, 'motor_ke.json')
 
+# How often (seconds) the reference file's mtime is checked on access
+CHECK_INTERVAL = 2.0
 
-@lru_cache(maxsize=1)
-def get_motor_reference() -> Dict[str, Any]:
-    """Load and cache the motor KE reference JSON."""
-    with open(REF_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """One parsed, frozen version of a reference file."""
+    data: Mapping[str, Any]
+    version: str
+    body: bytes  # pre-serialized JSON served by /api/reference/motor
+    loaded_at: float
+    mtime_ns: int
+    size: int
+
+
+class ReferenceStore:
+    """
+    Serves the current snapshot of a reference JSON file and swaps in a new
+    one when the file changes on disk (mtime/size polled at most every
+    `check_interval` seconds). Snapshots are immutable, so requests that
+    already hold one keep a consistent view while a reload happens.
+    A file that fails to parse is ignored and the previous snapshot stays live.
+    """
+
+    def __init__(self, path: str, check_interval: float = CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._next_check = 0.0
+
+    def snapshot(self) -> ReferenceSnapshot:
+        snap = self._snapshot
+        if snap is not None and time.monotonic() < self._next_check:
+            return snap
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                if self._snapshot is None:
+                    raise
+                return self._snapshot
+            current = self._snapshot
+            if current is None or (st.st_mtime_ns, st.st_size) != (current.mtime_ns, current.size):
+                self._load(st)
+            return self._snapshot
+
+    def reload(self) -> ReferenceSnapshot:
+        """Force a re-read of the file regardless of mtime."""
+        with self._lock:
+            self._load(os.stat(self.path))
+            return self._snapshot
+
+    def _load(self, st: os.stat_result) -> None:
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            parsed = json.loads(raw.decode('utf-8'))
+        except (OSError, ValueError) as e:
+            if self._snapshot is None:
+                raise
+            print(f"❌ Error reloading {os.path.basename(self.path)}, keeping version {self._snapshot.version}: {e}")
+            return
+        body = json.dumps(parsed, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        # Atomic swap: a single attribute assignment
+        self._snapshot = ReferenceSnapshot(
+            data=_freeze(parsed),
+            version=hashlib.sha256(body).hexdigest()[:16],
+            body=body,
+            loaded_at=time.time(),
+            mtime_ns=st.st_mtime_ns,
+            size=st.st_size,
+        )
+
+
+motor_reference_store = ReferenceStore(REF_FILE)
+
+
+def get_motor_reference() -> Mapping[str, Any]:
+    """Return the current (read-only) motor KE reference data."""
+    return motor_reference_store.snapshot().data
+
+
+def get_motor_reference_snapshot() -> ReferenceSnapshot:
+    """Return the current motor reference snapshot, including version and serialized body."""
+    return motor_reference_store.snapshot()
@@ -0,0 +1,307 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam
+
+from backend.app import db
+from backend.models.conversation import Conversation, ConversationState
+
+# Statuses that end the question flow; sessions reaching them are flushed immediately
+FINAL_STATUSES = ('ready_for_risk', 'completed')
+
+
+class SessionConflict(Exception):
+    """Raised by save() when another request changed the session since it was read."""
+
+
+@dataclass
+class ConversationSession(ConversationState):
+    """Working copy of a conversation's state, held in the session store between flushes."""
+    id: str
+    user_id: Optional[int]
+    data: Dict[str, Any] = field(default_factory=dict)
+    questions: List[Dict[str, Any]] = field(default_factory=list)
+    index: int = 0
+    status: str = 'in_progress'
+    version: int = 1
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_model(cls, conv: Conversation) -> 'ConversationSession':
+        return cls(
+            id=conv.id,
+            user_id=conv.user_id,
+            data=dict(conv.data or {}),
+            questions=list(conv.questions or []),
+            index=conv.index or 0,
+            status=conv.status or 'in_progress',
+            version=conv.version or 1,
+            created_at=conv.created_at,
+            updated_at=conv.updated_at,
+        )
+
+    def dumps(self) -> str:
+        state = asdict(self)
+        for key in ('created_at', 'updated_at'):
+            state[key] = state[key].isoformat() if state[key] else None
+        return json.dumps(state)
+
+    @classmethod
+    def loads(cls, raw: str) -> 'ConversationSession':
+        state = json.loads(raw)
+        for key in ('created_at', 'updated_at'):
+            state[key] = datetime.fromisoformat(state[key]) if state[key] else None
+        return cls(**state)
+
+
+class SessionStore:
+    """
+    Active conversation state with write-behind persistence.
+
+    Sessions live in a local SQLite file (WAL), so every worker process on the
+    host sees the same state and a turn is a primary-key read plus one
+    compare-and-set UPDATE instead of an ORM load and commit. Changed
+    sessions are marked dirty; a background thread writes them to the
+    `conversations` table in batches every `flush_interval` seconds (only if
+    their version is newer than the row's). Sessions that reach a final
+    status are flushed at once, and sessions idle for `idle_timeout` seconds
+    are flushed and dropped from the store. Dirty sessions left behind by a
+    crash are flushed when the next process starts.
+    """
+
+    def __init__(self, path: str | None = None, flush_interval: float = 2.0,
+                 idle_timeout: float = 300.0, batch_size: int = 200):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self.batch_size = batch_size
+        self._app = None
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.last_flush_ms: Optional[float] = None
+
+    # -- setup -------------------------------------------------------------
+
+    def init_app(self, app, start: bool = True) -> None:
+        """Configure from app config and (with `start`) start the flush thread."""
+        self._app = app
+        cfg = app.config
+        self.path = cfg.get('SESSION_STORE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+        self.flush_interval = float(cfg.get('SESSION_FLUSH_INTERVAL', self.flush_interval))
+        self.idle_timeout = float(cfg.get('SESSION_IDLE_TIMEOUT', self.idle_timeout))
+        self.batch_size = int(cfg.get('SESSION_FLUSH_BATCH', self.batch_size))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._ensure_schema()
+        if start:
+            self.start()
+            atexit.register(self.stop)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_schema(self) -> None:
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' id TEXT PRIMARY KEY,'
+            ' state TEXT NOT NULL,'
+            ' version INTEGER NOT NULL,'
+            ' dirty INTEGER NOT NULL DEFAULT 0,'
+            ' touched_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_dirty ON sessions (dirty, touched_at)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_touched ON sessions (touched_at)')
+
+    # -- session API -------------------------------------------------------
+
+    def get(self, conversation_id: str) -> Optional[ConversationSession]:
+        """The live session, loading it from the conversations table on a miss."""
+        row = self._conn().execute('SELECT state FROM sessions WHERE id = ?', (conversation_id,)).fetchone()
+        if row is not None:
+            with self._lock:
+                self.hits += 1
+            return ConversationSession.loads(row[0])
+        with self._lock:
+            self.misses += 1
+        conv = db.session.get(Conversation, conversation_id)
+        if conv is None:
+            return None
+        session = ConversationSession.from_model(conv)
+        self.put(session)
+        return session
+
+    def put(self, session: ConversationSession) -> None:
+        """Cache a session that matches the database row (not dirty)."""
+        self._conn().execute(
+            'INSERT OR IGNORE INTO sessions (id, state, version, dirty, touched_at) VALUES (?, ?, ?, 0, ?)',
+            (session.id, session.dumps(), session.version, time.time()),
+        )
+
+    def save(self, session: ConversationSession, expected_version: int) -> None:
+        """
+        Store the changed session if it is still at `expected_version`
+        (raises SessionConflict otherwise). Final statuses are flushed to the
+        database before returning.
+        """
+        # Upsert so a session evicted between get() and save() is simply re-added
+        cursor = self._conn().execute(
+            'INSERT INTO sessions (id, state, version, dirty, touched_at) VALUES (?, ?, ?, 1, ?)'
+            ' ON CONFLICT(id) DO UPDATE SET state = excluded.state, version = excluded.version,'
+            ' dirty = 1, touched_at = excluded.touched_at WHERE sessions.version = ?',
+            (session.id, session.dumps(), session.version, time.time(), expected_version),
+        )
+        if cursor.rowcount == 0:
+            with self._lock:
+                self.conflicts += 1
+            raise SessionConflict(f'Conversation {session.id} changed concurrently')
+        if session.status in FINAL_STATUSES:
+            self.flush([session.id])
+
+    # -- write-behind ------------------------------------------------------
+
+    def flush(self, ids: Optional[List[str]] = None) -> int:
+        """Write dirty sessions (all, or just `ids`) to the conversations table in one transaction."""
+        conn = self._conn()
+        if ids is None:
+            rows = conn.execute(
+                'SELECT id, state, version FROM sessions WHERE dirty = 1 ORDER BY touched_at LIMIT ?',
+                (self.batch_size,),
+            ).fetchall()
+        else:
+            placeholders = ','.join('?' * len(ids))
+            rows = conn.execute(
+                f'SELECT id, state, version FROM sessions WHERE dirty = 1 AND id IN ({placeholders})', ids
+            ).fetchall()
+        if not rows:
+            return 0
+
+        started = time.perf_counter()
+        params = []
+        for _, state, _ in rows:
+            session = ConversationSession.loads(state)
+            params.append({
+                'b_id': session.id,
+                'b_data': session.data,
+                'b_index': session.index,
+                'b_status': session.status,
+                'b_version': session.version,
+                'b_updated_at': session.updated_at or datetime.utcnow(),
+            })
+        table = Conversation.__table__
+        # Only move rows forward: a flush from another worker may already have written a newer version
+        stmt = table.update().where(
+            table.c.id == bindparam('b_id'),
+            table.c.version < bindparam('b_version'),
+        ).values(
+            data=bindparam('b_data'),
+            index=bindparam('b_index'),
+            status=bindparam('b_status'),
+            version=bindparam('b_version'),
+            updated_at=bindparam('b_updated_at'),
+        )
+        try:
+            db.session.execute(stmt, params)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        conn.executemany(
+            'UPDATE sessions SET dirty = 0 WHERE id = ? AND version = ?',
+            [(conv_id, version) for conv_id, _, version in rows],
+        )
+        with self._lock:
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+        return len(rows)
+
+    def flush_all(self) -> int:
+        total = 0
+        while True:
+            flushed = self.flush()
+            total += flushed
+            if flushed < self.batch_size:
+                return total
+
+    def evict_idle(self) -> int:
+        """Drop clean sessions untouched for idle_timeout (dirty ones are flushed first by the caller)."""
+        cursor = self._conn().execute(
+            'DELETE FROM sessions WHERE dirty = 0 AND touched_at < ?',
+            (time.time() - self.idle_timeout,),
+        )
+        return cursor.rowcount
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='session-flusher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._app is not None:
+            with self._app.app_context():
+                self.flush_all()
+
+    def _run(self) -> None:
+        with self._app.app_context():
+            while not self._stop.wait(self.flush_interval):
+                try:
+                    self.flush_all()
+                    self.evict_idle()
+                except Exception as e:
+                    print(f"❌ Session flush error: {e}")
+                finally:
+                    db.session.remove()
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            active, dirty = self._conn().execute(
+                'SELECT COUNT(*), COALESCE(SUM(dirty), 0) FROM sessions'
+            ).fetchone()
+        except sqlite3.Error:
+            active, dirty = None, None
+        with self._lock:
+            return {
+                'active': active,
+                'dirty': dirty,
+                'hits': self.hits,
+                'misses': self.misses,
+                'conflicts': self.conflicts,
+                'flushes': self.flushes,
+                'rows_flushed': self.rows_flushed,
+                'last_flush_ms': self.last_flush_ms,
+                'flush_interval_sec': self.flush_interval,
+            }
+
+
+# Global store; path and timings set from app config in create_app
+session_store = SessionStore()
@@ -0,0 +1,147 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+
+from backend.models.user import User
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """
+    Read-only snapshot of the authenticated user. Carries the attributes the
+    routes, PDF and email helpers read (id, email, name, language_preference),
+    so it can be passed wherever a User was. Load the User row explicitly
+    for writes.
+    """
+    id: int
+    email: str
+    name: str
+    language_preference: str
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> 'UserContext':
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            language_preference=user.language_preference or 'en',
+            is_active=bool(user.is_active) if user.is_active is not None else True,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as User.to_dict()"""
+        return {
+            'id': self.id,
+            'email': self.email,
+            'name': self.name,
+            'language_preference': self.language_preference,
+            'is_active': self.is_active,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class UserContextCache:
+    """
+    Short-TTL cache of UserContext snapshots keyed by JWT subject.
+    Writes in this process call invalidate(); other workers see a change
+    once the TTL runs out, so keep the TTL short.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 10000):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, ttl: float | None = None, max_size: int | None = None) -> None:
+        with self._lock:
+            if ttl is not None:
+                self.ttl = float(ttl)
+            if max_size is not None:
+                self.max_size = int(max_size)
+            self._entries.clear()
+
+    def get(self, subject: str) -> Optional[UserContext]:
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, subject: str, ctx: UserContext) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_size:
+                    self._entries.clear()
+            self._entries[subject] = (time.monotonic() + self.ttl, ctx)
+
+    def invalidate(self, user_id: int | str) -> None:
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Global cache instance; TTL set from app config in create_app
+user_context_cache = UserContextCache()
+
+
+def current_user() -> Optional[UserContext]:
+    """
+    The user behind the request's JWT, or None if the token has no subject
+    or the user no longer exists. Looked up at most once per request
+    (memoized on flask.g) and served from user_context_cache across requests.
+    Call after jwt_required()/verify_jwt_in_request().
+    """
+    if 'user_context' in g:
+        return g.user_context
+    subject = get_jwt_identity()
+    ctx = None
+    if subject is not None:
+        subject = str(subject)
+        ctx = user_context_cache.get(subject)
+        if ctx is None:
+            user = User.query.get(int(subject))
+            if user is not None:
+                ctx = UserContext.from_user(user)
+                user_context_cache.set(subject, ctx)
+    g.user_context = ctx
+    return ctx
+
+
+def invalidate_user(user_id: int | str) -> None:
+    """Drop the cached context for a user after their row changes."""
+    user_context_cache.invalidate(user_id)
+    ctx = g.get('user_context')
+    if ctx is not None and str(ctx.id) == str(user_id):
+        g.pop('user_context', None)
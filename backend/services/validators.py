@@ -1,5 +1,7 @@
+import threading
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from backend.services.reference.loader import get_motor_reference
 
@@ -53,6 +55,184 @@ def issuance_prechecks(coverage: Dict[str, Any], cover_type: str) -> Tuple[bool,
     return ok, {"missing_requirements": missing}
 
 
+AddonRule = Callable[[Dict[str, Any], Any, Any, List[str]], None]
+
+
+def _addon_rules(key: str, cfg: Dict[str, Any], ref: Dict[str, Any]) -> Tuple[AddonRule, ...]:
+    """Compile one add-on's reference config into a tuple of rule closures."""
+    rules: List[AddonRule] = []
+
+    allowed = frozenset(cfg.get('allowed_cover_types', []))
+    if allowed:
+        def check_cover(payload, cat, cov, errors):
+            if cov not in allowed:
+                errors.append(f"Add-on '{key}' not allowed for cover_type '{cov}'")
+        rules.append(check_cover)
+
+    # Optional category constraints per add-on
+    allowed_cats = frozenset(cfg.get('allowed_categories', []))
+    if allowed_cats:
+        def check_category(payload, cat, cov, errors):
+            if cat not in allowed_cats:
+                errors.append(f"Add-on '{key}' not allowed for vehicle_category '{cat}'")
+        rules.append(check_category)
+
+    # Back-compat: legacy global validation for loss_of_use
+    if key == 'loss_of_use':
+        legacy_cats = frozenset((ref.get('validation') or {}).get('loss_of_use_allowed_categories', []))
+        if legacy_cats:
+            def check_legacy_category(payload, cat, cov, errors):
+                if cat not in legacy_cats:
+                    errors.append(f"Add-on '{key}' not allowed for vehicle_category '{cat}'")
+            rules.append(check_legacy_category)
+
+    if cfg.get('requires_amount'):
+        amount_field = f"{key}_sum_insured" if key != 'windscreen' else 'windscreen_sum_insured'
+        required_error = f"{amount_field} is required when '{key}' add-on is selected"
+        number_error = f"{amount_field} must be a number"
+        limits = cfg.get('limits', {})
+        pct_limits = None
+        if limits and limits.get('type') == 'percent_of_vehicle_value':
+            min_pct = float(limits.get('min_pct', 0))
+            max_pct = float(limits.get('max_pct', 100))
+            pct_limits = (
+                min_pct / 100.0,
+                max_pct / 100.0,
+                f"{amount_field} must be between {min_pct}% and {max_pct}% of vehicle_value",
+            )
+
+        def check_amount(payload, cat, cov, errors):
+            amt = payload.get(amount_field)
+            if amt is None:
+                errors.append(required_error)
+                return
+            try:
+                amt_val = float(amt)
+            except Exception:
+                errors.append(number_error)
+                return
+            # Validate limits if vehicle_value present
+            if pct_limits is not None:
+                v = payload.get('vehicle_value')
+                try:
+                    vehicle_value = float(v) if v is not None else None
+                except Exception:
+                    vehicle_value = None
+                if vehicle_value:
+                    min_frac, max_frac, limit_error = pct_limits
+                    if not (vehicle_value * min_frac <= amt_val <= vehicle_value * max_frac):
+                        errors.append(limit_error)
+        rules.append(check_amount)
+
+    return tuple(rules)
+
+
+class MotorValidator:
+    """
+    Immutable motor payload validator compiled once from the reference data:
+    frozen vocabularies, precomputed error strings and per-add-on rule closures.
+    Use get_motor_validator() to obtain the instance for the current reference.
+    """
+
+    __slots__ = ('categories', 'covers', 'terms', 'addon_rules', 'comprehensive_requires_value',
+                 '_category_error', '_cover_error', '_term_error')
+
+    def __init__(self, ref: Dict[str, Any]):
+        categories = frozenset(ref.get('vehicle_categories', []))
+        covers = frozenset(ref.get('cover_types', []))
+        terms = frozenset(ref.get('terms', []))
+        object.__setattr__(self, 'categories', categories)
+        object.__setattr__(self, 'covers', covers)
+        object.__setattr__(self, 'terms', terms)
+        object.__setattr__(self, '_category_error', f"vehicle_category must be one of: {sorted(categories)}")
+        object.__setattr__(self, '_cover_error', f"cover_type must be one of: {sorted(covers)}")
+        object.__setattr__(self, '_term_error', f"term_months must be one of: {sorted(terms)}")
+        object.__setattr__(self, 'addon_rules', MappingProxyType({
+            key: _addon_rules(key, cfg, ref) for key, cfg in (ref.get('addons') or {}).items()
+        }))
+        object.__setattr__(self, 'comprehensive_requires_value',
+                           bool((ref.get('validation') or {}).get('comprehensive_requires_vehicle_value')))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MotorValidator is immutable')
+
+    def validate(self, payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """Same contract as validate_motor_payload."""
+        errors: List[str] = []
+
+        cat = payload.get('vehicle_category')
+        cov = payload.get('cover_type')
+        term = payload.get('term_months', 12)
+        add_ons = payload.get('add_ons') or []
+
+        # Controlled vocab
+        if cat not in self.categories:
+            errors.append(self._category_error)
+        if cov not in self.covers:
+            errors.append(self._cover_error)
+        try:
+            term_int = int(term)
+        except Exception:
+            term_int = None
+        if term_int not in self.terms:
+            errors.append(self._term_error)
+
+        # Normalize add_ons to list of keys
+        if isinstance(add_ons, dict):
+            selected_addons = [k for k, v in add_ons.items() if v]
+        elif isinstance(add_ons, list):
+            selected_addons = list(add_ons)
+        else:
+            errors.append('add_ons must be a list or object of flags')
+            selected_addons = []
+
+        # Add-on eligibility and limits
+        addon_rules = self.addon_rules
+        for key in selected_addons:
+            rules = addon_rules.get(key) if isinstance(key, str) else None
+            if rules is None:
+                errors.append(f"Unknown add-on: {key}")
+                continue
+            for rule in rules:
+                rule(payload, cat, cov, errors)
+
+        # Rule: comprehensive requires vehicle_value
+        if self.comprehensive_requires_value and cov == 'Comprehensive':
+            if payload.get('vehicle_value') in (None, '', 0):
+                errors.append('vehicle_value is required for Comprehensive cover')
+
+        ok = len(errors) == 0
+        normalized = {
+            'vehicle_category': cat,
+            'cover_type': cov,
+            'term_months': term_int or term,
+            'add_ons': selected_addons,
+        }
+        return ok, ({'errors': errors} if not ok else {'normalized': normalized})
+
+    def validate_many(self, payloads: Sequence[Dict[str, Any]]) -> List[Tuple[bool, Dict[str, Any]]]:
+        """Validate a batch of payloads against the same compiled rules."""
+        validate = self.validate
+        return [validate(p) for p in payloads]
+
+
+_validator_lock = threading.Lock()
+_compiled_validator: Optional[Tuple[Dict[str, Any], MotorValidator]] = None
+
+
+def get_motor_validator() -> MotorValidator:
+    """Validator for the current reference data; rebuilt only when the reference changes."""
+    global _compiled_validator
+    ref = get_motor_reference()
+    compiled = _compiled_validator
+    if compiled is not None and compiled[0] is ref:
+        return compiled[1]
+    with _validator_lock:
+        if _compiled_validator is None or _compiled_validator[0] is not ref:
+            _compiled_validator = (ref, MotorValidator(ref))
+        return _compiled_validator[1]
+
+
 def validate_motor_payload(payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
     """
     Validate motor-related fields in payload.
@@ -66,97 +246,4 @@ def validate_motor_payload(payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any
       - windscreen_sum_insured (when windscreen add-on selected and requires amount)
       - coverage: dict (may include vehicle_year etc.)
     """
-    ref = get_motor_reference()
-    errors: List[str] = []
-
-    # Controlled vocab
-    categories = set(ref.get('vehicle_categories', []))
-    covers = set(ref.get('cover_types', []))
-    terms = set(ref.get('terms', []))
-    addons_ref: Dict[str, Any] = ref.get('addons', {})
-
-    cat = payload.get('vehicle_category')
-    cov = payload.get('cover_type')
-    term = payload.get('term_months', 12)
-    add_ons = payload.get('add_ons') or []
-
-    if cat not in categories:
-        errors.append(f"vehicle_category must be one of: {sorted(categories)}")
-    if cov not in covers:
-        errors.append(f"cover_type must be one of: {sorted(covers)}")
-    try:
-        term_int = int(term)
-    except Exception:
-        term_int = None
-    if term_int not in terms:
-        errors.append(f"term_months must be one of: {sorted(terms)}")
-
-    # Normalize add_ons to list of keys
-    if isinstance(add_ons, dict):
-        selected_addons = [k for k, v in add_ons.items() if v]
-    elif isinstance(add_ons, list):
-        selected_addons = list(add_ons)
-    else:
-        errors.append('add_ons must be a list or object of flags')
-        selected_addons = []
-
-    # Add-on eligibility and limits
-    for key in selected_addons:
-        if key not in addons_ref:
-            errors.append(f"Unknown add-on: {key}")
-            continue
-        cfg = addons_ref[key]
-        allowed = set(cfg.get('allowed_cover_types', []))
-        if allowed and cov not in allowed:
-            errors.append(f"Add-on '{key}' not allowed for cover_type '{cov}'")
-        # Optional category constraints per add-on
-        allowed_cats = set(cfg.get('allowed_categories', []))
-        if allowed_cats and cat not in allowed_cats:
-            errors.append(f"Add-on '{key}' not allowed for vehicle_category '{cat}'")
-        # Back-compat: legacy global validation for loss_of_use
-        if key == 'loss_of_use':
-            legacy_cats = set((ref.get('validation') or {}).get('loss_of_use_allowed_categories', []))
-            if legacy_cats and cat not in legacy_cats:
-                errors.append(f"Add-on '{key}' not allowed for vehicle_category '{cat}'")
-        if cfg.get('requires_amount'):
-            amount_field = f"{key}_sum_insured" if key != 'windscreen' else 'windscreen_sum_insured'
-            amt = payload.get(amount_field)
-            if amt is None:
-                errors.append(f"{amount_field} is required when '{key}' add-on is selected")
-            else:
-                try:
-                    amt_val = float(amt)
-                except Exception:
-                    errors.append(f"{amount_field} must be a number")
-                    amt_val = None
-                # Validate limits if vehicle_value present
-                limits = cfg.get('limits', {})
-                if amt_val is not None and limits:
-                    v = payload.get('vehicle_value')
-                    try:
-                        vehicle_value = float(v) if v is not None else None
-                    except Exception:
-                        vehicle_value = None
-                    if limits.get('type') == 'percent_of_vehicle_value' and vehicle_value:
-                        min_pct = float(limits.get('min_pct', 0))
-                        max_pct = float(limits.get('max_pct', 100))
-                        min_amt = vehicle_value * (min_pct / 100.0)
-                        max_amt = vehicle_value * (max_pct / 100.0)
-                        if not (min_amt <= amt_val <= max_amt):
-                            errors.append(
-                                f"{amount_field} must be between {min_pct}% and {max_pct}% of vehicle_value"
-                            )
-
-    # Rule: comprehensive requires vehicle_value
-    if ref.get('validation', {}).get('comprehensive_requires_vehicle_value') and cov == 'Comprehensive':
-        if payload.get('vehicle_value') in (None, '', 0):
-            errors.append('vehicle_value is required for Comprehensive cover')
-
-    ok = len(errors) == 0
-    normalized = {
-        'vehicle_category': cat,
-        'cover_type': cov,
-        'term_months': term_int or term,
-        'add_ons': selected_addons,
-    }
-    return ok, ({'errors': errors} if not ok else {'normalized': normalized})
+    return get_motor_validator().validate(payload)
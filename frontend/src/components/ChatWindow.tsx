@@ -40,6 +40,10 @@ export const ChatWindow: React.FC<ChatWindowProps> = ({ isOpen, onClose, onMinim
     mechanical_assessment_done: false,
   });
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // Transcript buffer: chat messages are persisted in one /api/conversation/messages call per turn
+  const transcriptBuffer = useRef<{ sender: 'user' | 'bot'; text: string }[]>([]);
+  const transcriptTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const transcriptConversation = useRef<string | null>(null);
   const isBotTyping = messages.some(m => m.sender === 'bot' && m.isTyping);
   const { t } = useTranslation();
   const { isAuthenticated, register } = useAuth();
@@ -219,6 +223,32 @@ export const ChatWindow: React.FC<ChatWindowProps> = ({ isOpen, onClose, onMinim
     scrollToBottom();
   }, [messages]);
 
+  const flushTranscript = () => {
+    if (transcriptTimer.current) {
+      clearTimeout(transcriptTimer.current);
+      transcriptTimer.current = null;
+    }
+    const cid = transcriptConversation.current;
+    if (!cid || transcriptBuffer.current.length === 0) return;
+    const batch = transcriptBuffer.current.splice(0);
+    axios.post('/api/conversation/messages', { conversation_id: cid, messages: batch, delta: true }).catch(() => {});
+  };
+
+  const queueTranscript = (sender: 'user' | 'bot', text: string) => {
+    if (!transcriptConversation.current) return;
+    transcriptBuffer.current.push({ sender, text });
+    if (transcriptTimer.current) clearTimeout(transcriptTimer.current);
+    // Bot replies follow the user's message after the ~1.5s typing delay; one flush covers the turn
+    transcriptTimer.current = setTimeout(flushTranscript, 2000);
+  };
+
+  // Track the active conversation for the buffer; flush what is pending on switch and unmount
+  useEffect(() => {
+    flushTranscript();
+    transcriptConversation.current = conversationId;
+  }, [conversationId]);
+  useEffect(() => () => flushTranscript(), []);
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
@@ -315,16 +345,12 @@ export const ChatWindow: React.FC<ChatWindowProps> = ({ isOpen, onClose, onMinim
           )
         );
         // Persist bot message (final text) once typing finishes
-        if (conversationId) {
-          try {
-            axios.post('/api/conversation/message', { conversation_id: conversationId, sender: 'bot', text });
-          } catch {}
-        }
+        queueTranscript('bot', text);
       }, 1500);
     }
     // Persist immediate bot message (no typing)
-    if (!isTyping && conversationId) {
-      try { axios.post('/api/conversation/message', { conversation_id: conversationId, sender: 'bot', text }); } catch {}
+    if (!isTyping) {
+      queueTranscript('bot', text);
     }
   };
 
@@ -373,9 +399,7 @@ export const ChatWindow: React.FC<ChatWindowProps> = ({ isOpen, onClose, onMinim
     };
     setMessages(prev => [...prev, message]);
     // Persist user message
-    if (conversationId) {
-      try { axios.post('/api/conversation/message', { conversation_id: conversationId, sender: 'user', text }); } catch {}
-    }
+    queueTranscript('user', text);
   };
 
   // Issue a previously bound policy
@@ -1,13 +1,70 @@
 import { api } from './client'
 
+export interface ConversationEvent {
+  id?: string
+  event: string
+  data: any
+}
+
 export interface StartResponse {
   conversation_id: string
   next_question: any
   state: any
 }
 
+export interface ConversationDelta {
+  conversation_id: string
+  version: number
+  status: string
+  index: number
+  next_question: any
+  changed: Record<string, any>
+  message?: any
+}
+
 export const conversationApi = {
   start: (prefill?: Record<string, any>) => api.post<StartResponse>('/api/conversation/start', { prefill }).then(r => r.data),
   respond: (conversation_id: string, answer: any) => api.post('/api/conversation/respond', { conversation_id, answer }).then(r => r.data),
-  status: (conversation_id: string) => api.get(`/api/conversation/status/${conversation_id}`).then(r => r.data),
+  // Compact turn response; pass the last seen version to get a 412 instead of answering a stale question
+  respondDelta: (conversation_id: string, answer: any, version?: number) =>
+    api.post<ConversationDelta>('/api/conversation/respond', { conversation_id, answer, delta: true },
+      { headers: version ? { 'If-Match': `"${version}"` } : undefined }).then(r => r.data),
+  status: (conversation_id: string, after_seq?: number) =>
+    api.get(`/api/conversation/status/${conversation_id}`, { params: after_seq ? { after_seq } : undefined }).then(r => r.data),
+  // Server-Sent Events over fetch (EventSource cannot send the Authorization header).
+  // Resolves when the server ends the stream; call again with the last event id to resume.
+  stream: async (conversation_id: string, onEvent: (e: ConversationEvent) => void,
+                 lastEventId?: string, signal?: AbortSignal): Promise<string | undefined> => {
+    const token = localStorage.getItem('auth_token')
+    const headers: Record<string, string> = {}
+    if (token) headers.Authorization = `Bearer ${token}`
+    if (lastEventId) headers['Last-Event-ID'] = lastEventId
+    const res = await fetch(`${api.defaults.baseURL}/api/conversation/stream/${conversation_id}`, { headers, signal })
+    if (!res.ok || !res.body) throw new Error(`stream failed: ${res.status}`)
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let lastId = lastEventId
+    for (;;) {
+      const { value, done } = await reader.read()
+      if (done) return lastId
+      buffer += decoder.decode(value, { stream: true })
+      let sep: number
+      while ((sep = buffer.indexOf('\n\n')) >= 0) {
+        const block = buffer.slice(0, sep)
+        buffer = buffer.slice(sep + 2)
+        const evt: ConversationEvent = { event: 'message', data: null }
+        let data = ''
+        for (const line of block.split('\n')) {
+          if (line.startsWith('id: ')) evt.id = line.slice(4)
+          else if (line.startsWith('event: ')) evt.event = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        }
+        if (!data) continue
+        evt.data = JSON.parse(data)
+        if (evt.id) lastId = evt.id
+        onEvent(evt)
+      }
+    }
+  },
 }
@@ -0,0 +1,30 @@
+"""add covering index for quote stats
+
+Revision ID: 5b8e2f4c9a17
+Revises: 13c2128081b6
+Create Date: 2026-10-17 10:12:40.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2f4c9a17'
+down_revision = '13c2128081b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = {ix['name'] for ix in inspector.get_indexes('quotes')}
+
+    # Covering index for /user/quotes/stats (COUNT/SUM/MIN/MAX grouped by risk_level)
+    if 'ix_quotes_user_risk_amount' not in existing:
+        op.create_index('ix_quotes_user_risk_amount', 'quotes', ['user_id', 'risk_level', 'quote_amount'])
+
+
+def downgrade():
+    op.drop_index('ix_quotes_user_risk_amount', table_name='quotes')
@@ -0,0 +1,40 @@
+"""add (user_id, created_at) indexes on quotes and policies
+
+Revision ID: 8d41c7a2e6b3
+Revises: 5b8e2f4c9a17
+Create Date: 2026-10-17 14:03:12.550918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41c7a2e6b3'
+down_revision = '5b8e2f4c9a17'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = (
+    # (index name, table, columns)
+    ('ix_quotes_user_created', 'quotes', ['user_id', 'created_at']),
+    ('ix_policies_user_created', 'policies', ['user_id', 'created_at']),
+    ('ix_policies_quote_id', 'policies', ['quote_id']),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Filter by user, order by created_at DESC (history, latest quote/policy, KYC)
+    for name, table, columns in INDEXES:
+        existing = {ix['name'] for ix in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
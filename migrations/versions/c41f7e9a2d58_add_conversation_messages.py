@@ -0,0 +1,111 @@
+"""move conversation messages into an append-only conversation_messages table
+
+Revision ID: c41f7e9a2d58
+Revises: 8d41c7a2e6b3
+Create Date: 2026-10-17 16:21:40.318204
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7e9a2d58'
+down_revision = '8d41c7a2e6b3'
+branch_labels = None
+depends_on = None
+
+
+def _parse_ts(value):
+    try:
+        return datetime.fromisoformat(str(value).rstrip('Z'))
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+
+def _load(data):
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if 'conversation_messages' not in tables:
+        op.create_table(
+            'conversation_messages',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('conversation_id', sa.String(length=36), nullable=False),
+            sa.Column('seq', sa.Integer(), nullable=False),
+            sa.Column('sender', sa.String(length=10), nullable=False),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('conversation_id', 'seq', name='uq_conversation_messages_seq'),
+        )
+
+    if 'conversations' not in tables:
+        return
+
+    # Backfill: move data['messages'] out of the JSON blob into rows
+    conversations = sa.table('conversations', sa.column('id', sa.String), sa.column('data', sa.JSON))
+    messages = sa.table(
+        'conversation_messages',
+        sa.column('conversation_id', sa.String), sa.column('seq', sa.Integer),
+        sa.column('sender', sa.String), sa.column('text', sa.Text), sa.column('created_at', sa.DateTime),
+    )
+    for conv_id, data in bind.execute(sa.select(conversations.c.id, conversations.c.data)).fetchall():
+        data = _load(data)
+        legacy = data.pop('messages', None)
+        if not isinstance(legacy, list):
+            continue
+        rows = [
+            {
+                'conversation_id': conv_id,
+                'seq': seq,
+                'sender': str(m.get('sender') or 'bot')[:10],
+                'text': str(m.get('text') or ''),
+                'created_at': _parse_ts(m.get('ts')),
+            }
+            for seq, m in enumerate((m for m in legacy if isinstance(m, dict)), start=1)
+        ]
+        if rows:
+            op.bulk_insert(messages, rows)
+        bind.execute(conversations.update().where(conversations.c.id == conv_id).values(data=data))
+
+
+def downgrade():
+    bind = op.get_bind()
+    conversations = sa.table('conversations', sa.column('id', sa.String), sa.column('data', sa.JSON))
+    messages = sa.table(
+        'conversation_messages',
+        sa.column('conversation_id', sa.String), sa.column('seq', sa.Integer),
+        sa.column('sender', sa.String), sa.column('text', sa.Text), sa.column('created_at', sa.DateTime),
+    )
+
+    # Fold the rows back into data['messages']
+    by_conv = {}
+    rows = bind.execute(sa.select(messages).order_by(messages.c.conversation_id, messages.c.seq)).fetchall()
+    for row in rows:
+        by_conv.setdefault(row.conversation_id, []).append({
+            'sender': row.sender,
+            'text': row.text,
+            'ts': row.created_at.isoformat() + 'Z',
+        })
+    for conv_id, msgs in by_conv.items():
+        data = bind.execute(sa.select(conversations.c.data).where(conversations.c.id == conv_id)).scalar()
+        data = _load(data)
+        data['messages'] = msgs
+        bind.execute(conversations.update().where(conversations.c.id == conv_id).values(data=data))
+
+    op.drop_table('conversation_messages')
@@ -0,0 +1,32 @@
+"""add conversations.version for delta responses and If-Match
+
+Revision ID: e7a3b5d19c04
+Revises: c41f7e9a2d58
+Create Date: 2026-10-17 17:02:55.904127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b5d19c04'
+down_revision = 'c41f7e9a2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'conversations' not in inspector.get_table_names():
+        return
+
+    columns = {c['name'] for c in inspector.get_columns('conversations')}
+    if 'version' not in columns:
+        op.add_column('conversations', sa.Column('version', sa.Integer(), nullable=False, server_default=sa.text("1")))
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,106 @@
+"""
+Exercise the mail dispatcher against a local aiosmtpd server.
+
+Starts an in-process SMTP sink, points the app's mail settings at it,
+submits N messages through the dispatcher and reports throughput, SMTP
+connections opened, sink-side deliveries and the dispatcher's metrics.
+
+    pip install aiosmtpd
+    python scripts/bench_mail_dispatcher.py --messages 500 --rate 0
+"""
+import argparse
+import io
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Ensure backend package is importable regardless of how the script is invoked
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # optional, only needed for this script
+    Controller = None
+
+
+class CountingHandler:
+    """aiosmtpd handler that counts deliveries and SMTP sessions."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.messages = 0
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages += 1
+            self.sessions.add(id(session))
+        return '250 OK'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=0, help='messages/second limit (0 = unlimited)')
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+
+    if Controller is None:
+        sys.exit('aiosmtpd is not installed: pip install aiosmtpd')
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=args.port)
+    controller.start()
+
+    from backend.app import create_app
+    from backend.config import config, DevelopmentConfig
+    from backend.services.mail_dispatcher import mail_dispatcher, MailQueueFull
+    from flask_mail import Message
+
+    db_path = Path(tempfile.mkdtemp(prefix='bench_mail_')) / 'bench.db'
+    config['bench'] = type('BenchConfig', (DevelopmentConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'JOB_QUEUE_PATH': str(db_path.with_name('jobs.db')),
+        'MAIL_SERVER': '127.0.0.1', 'MAIL_PORT': args.port, 'MAIL_USE_TLS': False,
+        'MAIL_USERNAME': None, 'MAIL_PASSWORD': None, 'MAIL_DEBUG': False,
+        'MAIL_WORKERS': args.workers, 'MAIL_BATCH_SIZE': args.batch_size,
+        'MAIL_QUEUE_SIZE': args.queue_size, 'MAIL_RATE_LIMIT': args.rate,
+    })
+    with redirect_stdout(io.StringIO()):
+        app = create_app('bench')
+
+    futures = []
+    rejected = 0
+    t0 = time.perf_counter()
+    with app.app_context():
+        for i in range(args.messages):
+            msg = Message(subject=f'Renewal notice {i}', recipients=[f'user{i}@example.test'], body='Your policy is due.')
+            try:
+                futures.append(mail_dispatcher.submit(msg))
+            except MailQueueFull:
+                rejected += 1
+    failed = 0
+    for future in futures:
+        try:
+            future.result(timeout=120)
+        except Exception:
+            failed += 1
+    elapsed = time.perf_counter() - t0
+    controller.stop()
+
+    print(f'submitted={len(futures)} rejected={rejected} failed={failed} elapsed={elapsed:.2f}s '
+          f'throughput={len(futures) / elapsed:.1f} msg/s')
+    print(f'smtp sink: delivered={handler.messages} sessions={len(handler.sessions)}')
+    print(f'dispatcher: {mail_dispatcher.stats()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Concurrency benchmark for /api/predict writes on SQLite.
+
+Starts N worker processes (like gunicorn workers) against one fresh
+database file per mode. Each worker hammers /api/predict through a Flask
+test client for a fixed time. Compares the old connection defaults
+(rollback journal, synchronous=FULL) with the tuned config defaults (WAL,
+synchronous=NORMAL, mmap).
+
+    python scripts/bench_predict_writes.py --workers 4 --seconds 10
+"""
+import argparse
+import io
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+import warnings
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure backend package is importable regardless of how the script is invoked
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Config overrides per mode
+MODES: Dict[str, Dict[str, Any]] = {
+    'baseline': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_MMAP_SIZE': 0},
+    'tuned': {},  # backend/config.py defaults
+}
+
+PAYLOAD = {
+    'ID': 1, 'KIDSDRIV': 0, 'BIRTH': 1980, 'AGE': 40, 'HOMEKIDS': 0, 'YOJ': 10, 'INCOME': 50000, 'PARENT1': 0,
+    'HOME_VAL': 100000, 'MSTATUS': 1, 'GENDER': 1, 'EDUCATION': 2, 'OCCUPATION': 3, 'TRAVTIME': 20,
+    'CAR_USE': 0, 'BLUEBOOK': 12000, 'TIF': 5, 'CAR_TYPE': 2, 'RED_CAR': 0, 'OLDCLAIM': 0, 'CLM_FREQ': 0,
+    'REVOKED': 0, 'MVR_PTS': 1, 'CLM_AMT': 0, 'CAR_AGE': 5, 'URBANICITY': 1,
+    'vehicle_category': 'Private', 'cover_type': 'Comprehensive', 'term_months': 12,
+    'vehicle_value': 1500000, 'email_send': False,
+}
+
+
+def _make_app(mode: str, db_path: str):
+    from backend.app import create_app
+    from backend.config import config, DevelopmentConfig
+
+    overrides = dict(MODES[mode], SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}', MAIL_SUPPRESS_SEND=True)
+    config['bench'] = type('BenchConfig', (DevelopmentConfig,), overrides)
+    with redirect_stdout(io.StringIO()):
+        return create_app('bench')
+
+
+def _worker(mode: str, db_path: str, seconds: float, barrier, results) -> None:
+    warnings.filterwarnings('ignore')
+    app = _make_app(mode, db_path)
+    client = app.test_client()
+    token = client.post('/auth/ensure', json={}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    with redirect_stdout(io.StringIO()):
+        client.post('/api/predict', json=PAYLOAD, headers=headers)  # warm up model and connections
+
+    barrier.wait()
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    with redirect_stdout(io.StringIO()):
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            response = client.post('/api/predict', json=PAYLOAD, headers=headers)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if response.status_code != 200:
+                errors += 1
+    results.put((latencies, errors))
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_mode(mode: str, workers: int, seconds: float) -> Dict[str, float]:
+    db_path = os.path.join(tempfile.mkdtemp(prefix=f'bench_{mode}_'), 'bench.db')
+    _make_app(mode, db_path)  # create tables once before the workers race
+
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, db_path, seconds, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    latencies: List[float] = []
+    errors = 0
+    for _ in procs:
+        worker_latencies, worker_errors = results.get()
+        latencies.extend(worker_latencies)
+        errors += worker_errors
+    for p in procs:
+        p.join()
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': len(latencies) / seconds,
+        'p50': _percentile(latencies, 50),
+        'p95': _percentile(latencies, 95),
+        'p99': _percentile(latencies, 99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='concurrent worker processes')
+    parser.add_argument('--seconds', type=float, default=10.0, help='measured duration per mode')
+    parser.add_argument('--modes', default=','.join(MODES), help=f'comma-separated subset of {", ".join(MODES)}')
+    args = parser.parse_args()
+
+    print(f'{"mode":10s} {"requests":>9s} {"errors":>7s} {"req/s":>9s} {"p50 ms":>8s} {"p95 ms":>8s} {"p99 ms":>8s}')
+    for mode in args.modes.split(','):
+        r = run_mode(mode.strip(), args.workers, args.seconds)
+        print(f'{mode:10s} {r["requests"]:9d} {r["errors"]:7d} {r["throughput"]:9.1f} '
+              f'{r["p50"]:8.2f} {r["p95"]:8.2f} {r["p99"]:8.2f}')
+
+
+if __name__ == '__main__':
+    main()
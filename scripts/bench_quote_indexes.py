@@ -0,0 +1,176 @@
+"""
+Benchmark the per-user quote/policy queries with and without the
+(user_id, created_at) and policies.quote_id indexes.
+
+Seeds a scratch SQLite database with the app's schema (default 1M quotes),
+drops the indexes, prints EXPLAIN QUERY PLAN and latency for each hot
+query, then creates the indexes and repeats. The older
+ix_quotes_user_risk_amount index (5b8e2f4c9a17) stays in place for both
+runs, as it is on a database at the previous migration.
+
+    python scripts/bench_quote_indexes.py --quotes 1000000 --users 5000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from sqlalchemy import create_engine
+
+# Ensure backend package is importable regardless of how the script is invoked
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app import db
+import backend.models  # noqa: F401  (registers tables on db.metadata)
+
+# Indexes added by migration 8d41c7a2e6b3
+INDEXES = (
+    ('ix_quotes_user_created', 'quotes', ('user_id', 'created_at')),
+    ('ix_policies_user_created', 'policies', ('user_id', 'created_at')),
+    ('ix_policies_quote_id', 'policies', ('quote_id',)),
+)
+
+# (label, SQL) mirroring what the routes issue
+QUERIES = (
+    ('latest quote (email/pdf/users)',
+     'SELECT id FROM quotes WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1'),
+    ('quote history page',
+     'SELECT id, created_at, quote_amount, risk_level FROM quotes WHERE user_id = :user_id '
+     'ORDER BY created_at DESC LIMIT 10'),
+    ('quote history keyset page',
+     'SELECT id, created_at, quote_amount, risk_level FROM quotes WHERE user_id = :user_id '
+     'AND (created_at < :created_at OR (created_at = :created_at AND id < :id)) '
+     'ORDER BY created_at DESC, id DESC LIMIT 10'),
+    ('latest policy (KYC verify)',
+     'SELECT id FROM policies WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 1'),
+    ('policies for quote',
+     'SELECT id FROM policies WHERE quote_id = :quote_id'),
+)
+
+
+def seed(path: str, n_quotes: int, n_users: int, policy_ratio: float) -> None:
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+    for name, _, _ in INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+    now = datetime.utcnow()
+    conn.executemany(
+        'INSERT INTO users (id, email, name, password_hash, language_preference, is_active, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((i, f'bench{i}@example.com', f'Bench {i}', 'x', 'en', 1, now.isoformat(' ')) for i in range(1, n_users + 1)),
+    )
+
+    rng = random.Random(42)
+    levels = ('Low', 'Medium', 'High')
+    start = now - timedelta(days=365)
+
+    def quote_rows():
+        for i in range(1, n_quotes + 1):
+            created = start + timedelta(seconds=rng.randrange(365 * 86400))
+            yield (i, rng.randint(1, n_users), '{}', rng.randint(0, 100), rng.choice(levels),
+                   rng.randint(20000, 200000), 12, 'pending', 0, 0, created.isoformat(' '), 0, 0)
+
+    conn.executemany(
+        'INSERT INTO quotes (id, user_id, input_data, risk_score, risk_level, quote_amount, term_months, '
+        'kyc_status, valuation_required, mechanical_assessment_required, created_at, email_sent, pdf_generated) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        quote_rows(),
+    )
+
+    n_policies = int(n_quotes * policy_ratio)
+
+    def policy_rows():
+        for i, quote_id in enumerate(rng.sample(range(1, n_quotes + 1), n_policies), start=1):
+            created = start + timedelta(seconds=rng.randrange(365 * 86400))
+            yield (i, rng.randint(1, n_users), quote_id, f'POL-{i:08d}', 'bound', 50000, 12, 'pending', 0, 0,
+                   created.isoformat(' '), (created + timedelta(days=365)).isoformat(' '), created.isoformat(' '))
+
+    conn.executemany(
+        'INSERT INTO policies (id, user_id, quote_id, policy_number, status, premium, term_months, kyc_status, '
+        'valuation_required, mechanical_assessment_required, effective_date, expiry_date, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        policy_rows(),
+    )
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+
+def run_queries(conn: sqlite3.Connection, samples: List[Dict], repeat: int) -> List[Tuple[str, str, float]]:
+    """Return (label, plan, median ms) for every query."""
+    results = []
+    for label, sql in QUERIES:
+        plan_rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', samples[0]).fetchall()
+        plan = '; '.join(row[-1] for row in plan_rows)
+        timings = []
+        for params in samples[:repeat]:
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        results.append((label, plan, timings[len(timings) // 2]))
+    return results
+
+
+def report(title: str, results: List[Tuple[str, str, float]]) -> None:
+    print(f'\n=== {title} ===')
+    for label, plan, ms in results:
+        print(f'{label:32s} {ms:9.3f} ms   {plan}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quotes', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--policy-ratio', type=float, default=0.2, help='policies per quote')
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per query (median reported)')
+    parser.add_argument('--db', help='database file to (re)use; default is a temporary file')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench_idx_'), 'bench.db')
+    if not (args.db and os.path.exists(path)):
+        print(f'Seeding {args.quotes:,} quotes for {args.users:,} users into {path} ...')
+        t0 = time.perf_counter()
+        seed(path, args.quotes, args.users, args.policy_ratio)
+        print(f'Seeded in {time.perf_counter() - t0:.1f}s')
+
+    conn = sqlite3.connect(path)
+    rng = random.Random(7)
+    samples = []
+    for _ in range(args.repeat):
+        quote_id = rng.randint(1, args.quotes)
+        row = conn.execute('SELECT user_id, created_at FROM quotes WHERE id = ?', (quote_id,)).fetchone()
+        if row:
+            samples.append({'user_id': row[0], 'created_at': row[1], 'id': quote_id, 'quote_id': quote_id})
+
+    for name, _, _ in INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+    conn.execute('ANALYZE')
+    report('without the 8d41c7a2e6b3 indexes', run_queries(conn, samples, args.repeat))
+
+    t0 = time.perf_counter()
+    for name, table, columns in INDEXES:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+    conn.execute('ANALYZE')
+    conn.commit()
+    print(f'\nCreated indexes in {time.perf_counter() - t0:.1f}s')
+    report('with the 8d41c7a2e6b3 indexes', run_queries(conn, samples, args.repeat))
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Scripted checks for the conversation session store's write-behind rules.
+
+Builds the app against a scratch database and session file (the flush
+thread is effectively idle) and asserts that:
+  - save() with a stale expected version raises SessionConflict
+  - flush() never moves conversations.version backwards
+  - a save that lands while a flush is writing keeps the session dirty
+  - evict_idle() drops only clean sessions
+
+    python scripts/check_session_store.py
+"""
+import io
+import os
+import sys
+import tempfile
+import warnings
+from contextlib import redirect_stdout
+from dataclasses import replace
+from pathlib import Path
+
+# Ensure backend package is importable regardless of how the script is invoked
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _make_app(workdir: str):
+    from backend.app import create_app
+    from backend.config import config, DevelopmentConfig
+
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'check.db')}",
+        'SESSION_STORE_PATH': os.path.join(workdir, 'sessions.db'),
+        'SESSION_FLUSH_INTERVAL': 3600,  # flush only when the checks call it
+        'JOB_QUEUE_PATH': os.path.join(workdir, 'jobs.db'),
+        'PDF_CACHE_PERSIST': False,
+        'MAIL_SUPPRESS_SEND': True,
+    }
+    config['bench'] = type('BenchConfig', (DevelopmentConfig,), overrides)
+    with redirect_stdout(io.StringIO()):
+        return create_app('bench')
+
+
+def _new_conversation():
+    from backend.app import db
+    from backend.models.conversation import Conversation
+    from backend.services.session_store import session_store, ConversationSession
+
+    conv = Conversation(data={}, questions=[], index=0, status='in_progress', version=1)
+    db.session.add(conv)
+    db.session.commit()
+    session = ConversationSession.from_model(conv)
+    session_store.put(session)
+    return session
+
+
+def _db_row(conv_id: str):
+    from backend.app import db
+    from backend.models.conversation import Conversation
+
+    db.session.expire_all()
+    return db.session.get(Conversation, conv_id)
+
+
+def _dirty(conv_id: str) -> int:
+    from backend.services.session_store import session_store
+
+    return session_store._conn().execute('SELECT dirty FROM sessions WHERE id = ?', (conv_id,)).fetchone()[0]
+
+
+def check_stale_save_conflicts() -> None:
+    from backend.services.session_store import session_store, SessionConflict
+
+    session = _new_conversation()
+    first = replace(session, data={'answer': 'first'}, version=session.version + 1)
+    session_store.save(first, expected_version=session.version)
+    second = replace(session, data={'answer': 'second'}, version=session.version + 1)
+    try:
+        session_store.save(second, expected_version=session.version)
+    except SessionConflict:
+        pass
+    else:
+        raise AssertionError('stale save() was accepted')
+    assert session_store.get(session.id).data == {'answer': 'first'}
+
+
+def check_flush_never_moves_version_back() -> None:
+    from backend.app import db
+    from backend.models.conversation import Conversation
+    from backend.services.session_store import session_store
+
+    session = _new_conversation()
+    session_store.save(replace(session, data={'answer': 'old'}, version=2), expected_version=1)
+    # Another worker already wrote a newer state to the database
+    db.session.execute(
+        Conversation.__table__.update()
+        .where(Conversation.__table__.c.id == session.id)
+        .values(version=5, data={'answer': 'newer'})
+    )
+    db.session.commit()
+
+    session_store.flush([session.id])
+    row = _db_row(session.id)
+    assert row.version == 5, f'version moved back to {row.version}'
+    assert row.data == {'answer': 'newer'}, f'older state overwrote the row: {row.data}'
+
+
+def check_save_during_flush_stays_dirty() -> None:
+    from backend.app import db
+    from backend.services.session_store import session_store
+
+    session = _new_conversation()
+    v2 = replace(session, data={'answer': 'v2'}, version=2)
+    session_store.save(v2, expected_version=1)
+
+    # A turn is saved after flush() read v2 but before it clears the dirty flag
+    commit = db.session.commit
+
+    def commit_then_save():
+        commit()
+        del db.session.commit
+        session_store.save(replace(v2, data={'answer': 'v3'}, version=3), expected_version=2)
+
+    db.session.commit = commit_then_save
+    session_store.flush([session.id])
+
+    assert _db_row(session.id).version == 2
+    assert _dirty(session.id) == 1, 'v3 was marked clean without being flushed'
+    session_store.flush([session.id])
+    row = _db_row(session.id)
+    assert (row.version, row.data) == (3, {'answer': 'v3'}), (row.version, row.data)
+    assert _dirty(session.id) == 0
+
+
+def check_evict_idle_keeps_dirty() -> None:
+    from backend.services.session_store import session_store
+
+    clean = _new_conversation()
+    dirty = _new_conversation()
+    session_store.save(replace(dirty, data={'answer': 'unsaved'}, version=2), expected_version=1)
+
+    idle_timeout = session_store.idle_timeout
+    session_store.idle_timeout = -1  # everything counts as idle
+    try:
+        session_store.evict_idle()
+    finally:
+        session_store.idle_timeout = idle_timeout
+
+    ids = {row[0] for row in session_store._conn().execute('SELECT id FROM sessions')}
+    assert clean.id not in ids, 'idle clean session was not evicted'
+    assert dirty.id in ids, 'dirty session was evicted before being flushed'
+
+
+CHECKS = (
+    check_stale_save_conflicts,
+    check_flush_never_moves_version_back,
+    check_save_during_flush_stays_dirty,
+    check_evict_idle_keeps_dirty,
+)
+
+
+def main() -> int:
+    warnings.filterwarnings('ignore')
+    workdir = tempfile.mkdtemp(prefix='check_sessions_')
+    app = _make_app(workdir)
+
+    from backend.app import db
+    from backend.services.session_store import session_store
+
+    failures = 0
+    with app.app_context():
+        for check in CHECKS:
+            try:
+                check()
+                print(f'✅ {check.__name__}')
+            except AssertionError as e:
+                failures += 1
+                print(f'❌ {check.__name__}: {e}')
+            finally:
+                db.session.remove()
+    session_store.stop()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())